@@ -0,0 +1,159 @@
+"""
+Build the packed offline bundle served at /api/bundle.
+
+Packs every row of the diagnosis CSV the server ranks from
+(krishi-ai-backend/data/crop_diagnosis.csv, or DIAGNOSIS_CSV_PATH), a token
+search index and (optionally) pre-synthesized Bangla advisory audio into a
+single .kpack file. Audio always comes from the given Gemini model/voice with
+no failover, so audio keys always match the audio stored under them.
+When --base points at the bundle clients already have, a delta bundle with
+only the changed entries is written as well, and audio already present in
+the base is reused instead of being synthesized again.
+
+Usage:
+    python execution/build_offline_bundle.py --version 2 [--audio] [--base PATH]
+        [--model MODEL] [--voice VOICE]
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import os
+import re
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "krishi-ai-backend"))
+
+from app.services.offline_bundle import (  # noqa: E402
+    BundleReader,
+    BundleWriter,
+    build_delta,
+    BUNDLE_EXTENSION,
+    KIND_AUDIO,
+    KIND_INDEX,
+    KIND_RECORD,
+)
+from app.services.text_normalization import canonicalize_text, text_cache_key  # noqa: E402
+from app.services.tts_service import TTS_MODEL, TTS_VOICE  # noqa: E402
+from app.services.diagnosis_index import DIAGNOSIS_CSV_PATH  # noqa: E402
+
+DEFAULT_CSV = DIAGNOSIS_CSV_PATH
+DEFAULT_OUT_DIR = os.path.join(ROOT, "krishi-ai-backend", "bundles")
+SEARCH_FIELDS = ("crop", "symptom", "diagnosis", "category", "management", "bangla_management")
+TOKEN_SPLIT = re.compile(r'[\s,;:.()।/"\'_+-]+')
+
+
+def load_records(csv_path):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    for row in rows:
+        row["confidence"] = int(row["confidence"]) if row.get("confidence") else None
+    return rows
+
+
+def record_key(row):
+    return f"record/{row['crop']}/{row['symptom']}"
+
+
+def build_search_index(rows):
+    index = {}
+    for row in rows:
+        key = record_key(row)
+        for field in SEARCH_FIELDS:
+            for token in TOKEN_SPLIT.split(canonicalize_text(row.get(field) or "").lower()):
+                if len(token) > 1:
+                    index.setdefault(token, set()).add(key)
+    return {token: sorted(keys) for token, keys in sorted(index.items())}
+
+
+async def synthesize_audio(texts, model, voice):
+    """
+    Synthesize each text once with exactly one model/voice; returns {audio_key: pcm_bytes}.
+
+    The router is bypassed on purpose: a fallback provider's audio would be
+    stored under this model/voice's key and reused by every later --base build.
+    """
+    from app.services.tts_service import TTSError, sanitize_text, validate_text
+    from app.services.tts_providers import GeminiTTSProvider, PROVIDER_TIMEOUT
+
+    provider = GeminiTTSProvider(model, voice)
+    audio = {}
+    for audio_key, text in texts.items():
+        is_valid, error_message = validate_text(text)
+        if not is_valid:
+            raise TTSError(f"{audio_key}: {error_message}", error_code="INVALID_INPUT")
+        print(f"  synthesizing {audio_key} ({len(text)} chars) with {provider.key}")
+        audio[audio_key] = await asyncio.wait_for(
+            provider.synthesize(sanitize_text(text)), PROVIDER_TIMEOUT
+        )
+    return audio
+
+
+def build(args, rows, base):
+    """Write the full bundle and, when a base is given, the delta against it."""
+    writer = BundleWriter(args.version)
+
+    pending_audio = {}
+    for row in rows:
+        text = row.get("bangla_management") or row.get("management") or ""
+        if args.audio and text:
+            audio_key = f"audio/{text_cache_key(text, args.model, args.voice)}"
+            row["audio"] = audio_key
+            cached = base.get(audio_key) if base else None
+            if cached is not None:
+                # Copy out of the base mapping so it can be closed afterwards
+                writer.add(audio_key, KIND_AUDIO, bytes(cached))
+                cached.release()
+            else:
+                pending_audio[audio_key] = text
+        payload = json.dumps(row, ensure_ascii=False, separators=(",", ":"))
+        writer.add(record_key(row), KIND_RECORD, payload.encode("utf-8"))
+
+    for audio_key, pcm in asyncio.run(synthesize_audio(pending_audio, args.model, args.voice)).items():
+        writer.add(audio_key, KIND_AUDIO, pcm)
+
+    search_index = json.dumps(build_search_index(rows), ensure_ascii=False, separators=(",", ":"))
+    writer.add("index/search", KIND_INDEX, search_index.encode("utf-8"))
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    full_path = os.path.join(args.out_dir, f"{args.name}-v{args.version}{BUNDLE_EXTENSION}")
+    size = writer.write(full_path)
+    print(f"Wrote {full_path}: {len(writer)} entries, {size} bytes")
+
+    if base is not None:
+        delta = build_delta(base, writer, args.version)
+        delta_path = os.path.join(
+            args.out_dir,
+            f"{args.name}-v{args.version}-from-v{base.bundle_version}{BUNDLE_EXTENSION}"
+        )
+        size = delta.write(delta_path)
+        print(f"Wrote {delta_path}: {len(delta)} entries, {size} bytes")
+
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the packed offline bundle")
+    parser.add_argument("--csv", default=DEFAULT_CSV)
+    parser.add_argument("--out-dir", default=DEFAULT_OUT_DIR)
+    parser.add_argument("--name", default="diagnosis")
+    parser.add_argument("--version", type=int, default=int(time.time()))
+    parser.add_argument("--base", help="Previous full bundle to diff against")
+    parser.add_argument("--audio", action="store_true", help="Pre-synthesize advisory audio")
+    parser.add_argument("--model", default=TTS_MODEL, help="Gemini TTS model for --audio")
+    parser.add_argument("--voice", default=TTS_VOICE, help="Prebuilt voice for --audio")
+    args = parser.parse_args()
+
+    rows = load_records(args.csv)
+    base = BundleReader(args.base) if args.base else None
+    try:
+        build(args, rows, base)
+    finally:
+        if base is not None:
+            base.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -16,7 +16,7 @@ def deploy_project():
     
     # Check Gemini API before continuing
     print("Step 1: Validating API Keys")
-    run_cmd("python verify_gemini_model.py", cwd="execution")
+    run_cmd("python verify_gemini_model.py --gate", cwd="execution")
     
     print("Step 2: Checking Git Status & Push")
     # For automated script, we could push here. Currently just testing the status.
@@ -0,0 +1,92 @@
+"""
+Local stand-in for the Gemini generateContent endpoint.
+
+Serves POST /v1beta/models/<model>:generateContent with configurable latency
+and failure rate per model, returning a text part for text models and
+silent 24kHz PCM inline audio for TTS models. Use it to exercise
+verify_gemini_model.py without network access or an API key.
+
+Usage:
+    python gemini_stand_in.py --port 8787 \
+        --latency gemini-2.5-flash-preview-tts=300 --fail gemini-2.5-pro-preview-tts=0.5
+"""
+
+import re
+import json
+import time
+import base64
+import random
+import argparse
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+PATH_PATTERN = re.compile(r'^/v1beta/models/([^/:]+):generateContent$')
+SILENT_AUDIO = base64.b64encode(b"\0\0" * 2400).decode("ascii")
+
+
+def parse_pairs(values, cast):
+    pairs = {}
+    for value in values or []:
+        model, _, setting = value.partition("=")
+        pairs[model] = cast(setting)
+    return pairs
+
+
+def make_handler(latency_ms, failure_rate, default_latency_ms):
+    class StandInHandler(BaseHTTPRequestHandler):
+        def do_POST(self):
+            match = PATH_PATTERN.match(self.path.split("?")[0])
+            self.rfile.read(int(self.headers.get("Content-Length") or 0))
+            if not match:
+                self.send_json(404, {"error": {"code": 404, "message": "Not found"}})
+                return
+
+            model = match.group(1)
+            time.sleep(latency_ms.get(model, default_latency_ms) / 1000)
+            if random.random() < failure_rate.get(model, 0.0):
+                self.send_json(503, {"error": {"code": 503, "message": "Stand-in failure"}})
+                return
+
+            if "tts" in model:
+                part = {"inlineData": {"mimeType": "audio/L16;codec=pcm;rate=24000", "data": SILENT_AUDIO}}
+            else:
+                part = {"text": "OK"}
+            self.send_json(200, {"candidates": [{"content": {"parts": [part], "role": "model"}}]})
+
+        def send_json(self, status, body):
+            payload = json.dumps(body).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            self.end_headers()
+            self.wfile.write(payload)
+
+        def log_message(self, format, *args):
+            pass
+
+    return StandInHandler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local Gemini generateContent stand-in")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8787)
+    parser.add_argument("--default-latency", type=float, default=50.0, help="Milliseconds")
+    parser.add_argument("--latency", action="append", help="model=milliseconds")
+    parser.add_argument("--fail", action="append", help="model=failure_rate (0..1)")
+    args = parser.parse_args()
+
+    handler = make_handler(
+        parse_pairs(args.latency, float),
+        parse_pairs(args.fail, float),
+        args.default_latency
+    )
+    server = ThreadingHTTPServer((args.host, args.port), handler)
+    print(f"Gemini stand-in listening on http://{args.host}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Report how much canonical text normalization increases TTS cache key collisions.
+
+Reads every advisory text column in data/*.csv, splits it into the utterances
+the app sends to /api/tts (one per ';' or '।' separated clause) and compares
+the number of distinct keys produced by the legacy sanitizer (markdown strip
++ whitespace collapse) against the canonical pipeline in the backend.
+
+Usage: python execution/text_key_collisions.py [data_dir]
+"""
+
+import csv
+import os
+import re
+import sys
+from collections import defaultdict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "krishi-ai-backend"))
+
+from app.services.text_normalization import canonicalize_text  # noqa: E402
+
+TEXT_COLUMNS = {
+    "diagnosis", "management", "bangla_management",
+    "description", "bangla_description",
+}
+UTTERANCE_SPLIT = re.compile(r'[;।]')
+MARKDOWN_PATTERN = re.compile(r'[*#_~`]')
+
+
+def legacy_key(text):
+    """Key as computed before canonicalization was introduced."""
+    return ' '.join(MARKDOWN_PATTERN.sub('', text).split())
+
+
+def canonical_key(text):
+    return canonicalize_text(MARKDOWN_PATTERN.sub('', text))
+
+
+def load_utterances(data_dir):
+    utterances = []
+    for name in sorted(os.listdir(data_dir)):
+        if not name.endswith(".csv"):
+            continue
+        with open(os.path.join(data_dir, name), newline="", encoding="utf-8") as f:
+            for row in csv.DictReader(f):
+                for column in TEXT_COLUMNS.intersection(row):
+                    for part in UTTERANCE_SPLIT.split(row[column] or ""):
+                        if part.strip():
+                            utterances.append(part)
+    return utterances
+
+
+def main():
+    data_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(ROOT, "data")
+    utterances = load_utterances(data_dir)
+    if not utterances:
+        print(f"ERROR: no advisory text found in {data_dir}")
+        sys.exit(1)
+
+    legacy = {legacy_key(u) for u in utterances}
+    merged = defaultdict(set)
+    for u in utterances:
+        merged[canonical_key(u)].add(legacy_key(u))
+
+    total = len(utterances)
+    print(f"Utterances:            {total}")
+    print(f"Distinct legacy keys:  {len(legacy)} (hit rate {1 - len(legacy) / total:.1%})")
+    print(f"Distinct canonical:    {len(merged)} (hit rate {1 - len(merged) / total:.1%})")
+    print(f"Keys merged:           {len(legacy) - len(merged)}")
+
+    for key, variants in merged.items():
+        if len(variants) > 1:
+            print(f"  {key!r} <- {sorted(variants)!r}")
+
+
+if __name__ == "__main__":
+    main()
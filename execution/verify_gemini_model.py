@@ -1,34 +1,232 @@
+"""
+Probe candidate Gemini models concurrently and rank them by latency.
+
+Every candidate model (text and TTS) is called N times over one pooled HTTP
+session. Each call must return a usable payload (text candidates, or inline
+audio for TTS models), not just HTTP 200. Per-model success rate and latency
+percentiles are written to a ranking file. The backend reads that file at
+startup to pick the fastest healthy TTS model.
+
+Exits 0 if at least one TTS model is healthy.
+
+--gate is the cheap check deploy_pipeline.py runs: one call each to
+gemini-2.5-flash and the default TTS model, both of which must respond. It
+does not write the ranking file.
+
+The ranking file is a local, per-environment artifact (gitignored); without
+it the backend keeps its configured model order.
+
+Usage:
+    python verify_gemini_model.py [--runs 5] [--models a,b,...] [--base-url URL]
+    python verify_gemini_model.py --gate
+
+Run against the local stand-in (no API key needed):
+    python gemini_stand_in.py --port 8787 &
+    python verify_gemini_model.py --base-url http://127.0.0.1:8787
+"""
+
 import os
-import requests
-import json
 import sys
+import json
+import time
+import argparse
+import statistics
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timezone
+
+import requests
+from requests.adapters import HTTPAdapter
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASE_URL = "https://generativelanguage.googleapis.com"
+DEFAULT_MODELS = [
+    "gemini-2.5-flash",
+    "gemini-2.5-flash-lite",
+    "gemini-2.5-flash-preview-tts",
+    "gemini-2.5-pro-preview-tts",
+]
+GATE_MODELS = ["gemini-2.5-flash", "gemini-2.5-flash-preview-tts"]
+DEFAULT_OUTPUT = os.path.join(ROOT, "krishi-ai-backend", "model_ranking.json")
+HEALTHY_SUCCESS_RATE = 0.8
+TTS_VOICE = "Kore"
+
+
+def is_tts_model(model):
+    return "tts" in model
+
+
+def build_payload(model):
+    if is_tts_model(model):
+        return {
+            "contents": [{"parts": [{"text": "ধানের পাতায় হলুদ দাগ।"}]}],
+            "generationConfig": {
+                "responseModalities": ["AUDIO"],
+                "speechConfig": {
+                    "voiceConfig": {"prebuiltVoiceConfig": {"voiceName": TTS_VOICE}}
+                }
+            }
+        }
+    return {"contents": [{"parts": [{"text": "Return 'OK' if you can read this."}]}]}
+
+
+def has_usable_output(model, body):
+    """Check the response carries text (or audio for TTS models), not just a 200."""
+    for candidate in body.get("candidates") or []:
+        for part in (candidate.get("content") or {}).get("parts") or []:
+            if is_tts_model(model):
+                if (part.get("inlineData") or {}).get("data"):
+                    return True
+            elif part.get("text"):
+                return True
+    return False
+
+
+def probe_once(session, base_url, api_key, model, timeout):
+    """Call one model once; returns (ok, latency_ms, error)."""
+    url = f"{base_url}/v1beta/models/{model}:generateContent"
+    headers = {"Content-Type": "application/json"}
+    if api_key:
+        headers["x-goog-api-key"] = api_key
+
+    start = time.perf_counter()
+    try:
+        response = session.post(url, headers=headers, data=json.dumps(build_payload(model)), timeout=timeout)
+        latency_ms = (time.perf_counter() - start) * 1000
+        if response.status_code != 200:
+            return False, latency_ms, f"HTTP {response.status_code}"
+        if not has_usable_output(model, response.json()):
+            return False, latency_ms, "response has no usable output"
+        return True, latency_ms, None
+    except (requests.RequestException, ValueError) as e:
+        return False, (time.perf_counter() - start) * 1000, str(e)
+
+
+def percentile(values, q):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))]
+
+
+def format_ms(value):
+    return f"{value}ms" if value is not None else "n/a"
+
+
+def summarize(model, results):
+    latencies = [latency for ok, latency, _ in results if ok]
+    errors = sorted({error for ok, _, error in results if not ok})
+    success_rate = len(latencies) / len(results) if results else 0.0
+    return {
+        "model": model,
+        "kind": "tts" if is_tts_model(model) else "text",
+        "runs": len(results),
+        "successes": len(latencies),
+        "success_rate": round(success_rate, 3),
+        "healthy": success_rate >= HEALTHY_SUCCESS_RATE,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 1) if latencies else None,
+            "p90": round(percentile(latencies, 90), 1) if latencies else None,
+            "p99": round(percentile(latencies, 99), 1) if latencies else None,
+            "mean": round(statistics.mean(latencies), 1) if latencies else None,
+            "min": round(min(latencies), 1) if latencies else None,
+            "max": round(max(latencies), 1) if latencies else None,
+        },
+        "errors": errors[:5],
+    }
+
+
+def rank(summaries):
+    """Healthy models first, fastest median first; unhealthy ones after."""
+    ordered = sorted(
+        summaries,
+        key=lambda s: (not s["healthy"], s["latency_ms"]["p50"] is None, s["latency_ms"]["p50"] or 0)
+    )
+    for position, summary in enumerate(ordered, start=1):
+        summary["rank"] = position
+    return ordered
+
+
+def probe_models(base_url, api_key, models, runs, concurrency, timeout):
+    results = {model: [] for model in models}
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=len(models), pool_maxsize=concurrency)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    with session, ThreadPoolExecutor(max_workers=concurrency) as executor:
+        futures = {
+            executor.submit(probe_once, session, base_url, api_key, model, timeout): model
+            for model in models
+            for _ in range(runs)
+        }
+        for future in as_completed(futures):
+            results[futures[future]].append(future.result())
+
+    return rank([summarize(model, results[model]) for model in models])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Probe Gemini models and rank them by latency")
+    parser.add_argument("--models", default=os.environ.get("PROBE_MODELS", ",".join(DEFAULT_MODELS)))
+    parser.add_argument("--runs", type=int, default=5, help="Calls per model")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--base-url", default=os.environ.get("GEMINI_API_BASE", DEFAULT_BASE_URL))
+    parser.add_argument("--output", default=DEFAULT_OUTPUT, help="Ranking file the backend reads")
+    parser.add_argument(
+        "--gate", action="store_true",
+        help="Deploy gate: one call per gate model, all must succeed, no ranking file"
+    )
+    args = parser.parse_args()
+
+    if args.gate:
+        models = GATE_MODELS
+        args.runs = 1
+    else:
+        models = [m.strip() for m in args.models.split(",") if m.strip()]
+    base_url = args.base_url.rstrip("/")
 
-def test_gemini_api():
     print("Testing Gemini API keys loaded from Environment...")
-    # Get Key
     api_key = os.environ.get("GEMINI_API_KEY") or os.environ.get("VITE_GEMINI_API_KEY")
-    if not api_key:
+    if not api_key and base_url == DEFAULT_BASE_URL:
         print("ERROR: GEMINI_API_KEY not set.")
         sys.exit(1)
-        
-    url = f"https://generativelanguage.googleapis.com/v1beta/models/gemini-2.5-flash:generateContent?key={api_key}"
-    headers = {"Content-Type": "application/json"}
-    data = {
-        "contents": [{"parts":[{"text": "Return 'OK' if you can read this."}]}]
-    }
 
-    try:
-        response = requests.post(url, headers=headers, data=json.dumps(data), timeout=10)
-        if response.status_code == 200:
-            print("SUCCESS: Gemini API is fully functional.")
+    print(f"Probing {len(models)} models x {args.runs} runs against {base_url}")
+    ranking = probe_models(base_url, api_key, models, args.runs, args.concurrency, args.timeout)
+
+    for summary in ranking:
+        latency = summary["latency_ms"]
+        status = "OK  " if summary["healthy"] else "FAIL"
+        print(
+            f"{summary['rank']:>2}. {status} {summary['model']:<32} "
+            f"success {summary['success_rate']:.0%}  p50 {format_ms(latency['p50'])}  "
+            f"p90 {format_ms(latency['p90'])}"
+            + (f"  errors: {'; '.join(summary['errors'])}" if summary["errors"] else "")
+        )
+
+    if args.gate:
+        if all(summary["healthy"] for summary in ranking):
+            print("SUCCESS: Gemini API is functional.")
             sys.exit(0)
-        else:
-            print(f"FAILED: Gemini returned HTTP {response.status_code}")
-            print(f"Details: {response.text}")
-            sys.exit(1)
-    except Exception as e:
-        print(f"ERROR: Exception occurred connecting to Gemini API: {e}")
+        print("FAILED: a required Gemini model did not respond.")
         sys.exit(1)
 
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+            "base_url": base_url,
+            "runs": args.runs,
+            "models": ranking,
+        }, f, indent=2)
+    print(f"Ranking written to {args.output}")
+
+    if any(summary["healthy"] and summary["kind"] == "tts" for summary in ranking):
+        print("SUCCESS: Gemini API is functional.")
+        sys.exit(0)
+    print("FAILED: no healthy Gemini TTS model.")
+    sys.exit(1)
+
+
 if __name__ == "__main__":
-    test_gemini_api()
+    main()
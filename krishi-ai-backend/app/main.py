@@ -11,10 +11,13 @@ from typing import List
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, PlainTextResponse
 from fastapi.exceptions import RequestValidationError
 
-from .routes import tts_router
+from .routes import tts_router, bundle_router, diagnosis_router
+from .services.loop_monitor import loop_monitor, LOOP_MONITOR_ENABLED
+from .services.tts_providers import get_tts_router
+from .services.diagnosis_index import get_diagnosis_index, DiagnosisIndexError
 
 # Configure logging
 logging.basicConfig(
@@ -70,9 +73,24 @@ async def lifespan(app: FastAPI):
     else:
         logger.info("GEMINI_API_KEY is configured")
     
+    # Build the TTS router now so the model ranking file is read at startup
+    tts_providers = [provider.key for provider in get_tts_router().ranked()]
+    logger.info(f"TTS providers (routing order): {tts_providers}")
+    
+    # Load the diagnosis data now so a missing CSV shows up in the startup logs
+    try:
+        get_diagnosis_index()
+    except DiagnosisIndexError as e:
+        logger.error(f"Diagnosis index unavailable - /api/diagnosis will return 503: {str(e)}")
+    
+    # Watch for blocking calls on the event loop
+    if LOOP_MONITOR_ENABLED:
+        loop_monitor.start()
+    
     yield
     
     # Shutdown
+    await loop_monitor.stop()
     logger.info(f"Shutting down {APP_NAME}")
 
 
@@ -89,6 +107,14 @@ app = FastAPI(
       * Voice: Kore (prebuilt)
       * Audio format: PCM (24kHz, mono)
       * Max text length: 1000 characters
+      * Streaming: WebSocket `/api/tts/ws` synthesizes sentences as text arrives
+    
+    * **Offline Bundles**: Packed diagnosis records, search index and advisory
+      audio for offline clients, served with byte-range support at `/api/bundle`
+    
+    * **Diagnosis Ranking**: Rank candidate diagnoses for a crop and several
+      observed symptoms (single or batched) at `/api/diagnosis/rank`, or stream
+      a whole survey CSV to `/api/diagnosis/bulk` for NDJSON results
     
     ## Authentication
     
@@ -152,6 +178,8 @@ async def general_exception_handler(request: Request, exc: Exception):
 
 # Include routers
 app.include_router(tts_router)
+app.include_router(bundle_router)
+app.include_router(diagnosis_router)
 
 
 # Root endpoint
@@ -167,7 +195,12 @@ async def root():
         "docs": "/docs",
         "endpoints": {
             "tts": "/api/tts",
-            "tts_health": "/api/tts/health"
+            "tts_stream": "/api/tts/ws",
+            "tts_health": "/api/tts/health",
+            "offline_bundles": "/api/bundle",
+            "diagnosis_rank": "/api/diagnosis/rank",
+            "metrics": "/metrics",
+            "event_loop": "/health/loop"
         }
     }
 
@@ -185,6 +218,24 @@ async def health():
     }
 
 
+# Event loop lag details, including stacks captured while the loop was blocked
+@app.get("/health/loop", tags=["Health"])
+async def loop_health():
+    """
+    Event loop health - Returns scheduling lag statistics and recent blocking events.
+    """
+    return loop_monitor.snapshot()
+
+
+# Metrics endpoint (Prometheus text format)
+@app.get("/metrics", tags=["Health"], response_class=PlainTextResponse)
+async def metrics():
+    """
+    Metrics endpoint - Returns event loop lag metrics for Prometheus scraping.
+    """
+    return "\n".join(loop_monitor.prometheus_lines()) + "\n"
+
+
 # For running with uvicorn directly
 if __name__ == "__main__":
     import uvicorn
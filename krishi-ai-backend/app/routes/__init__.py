@@ -3,5 +3,7 @@ Routes package for the Krishiai backend API.
 """
 
 from .tts import router as tts_router
+from .bundle import router as bundle_router
+from .diagnosis import router as diagnosis_router
 
-__all__ = ['tts_router']
+__all__ = ['tts_router', 'bundle_router', 'diagnosis_router']
@@ -0,0 +1,178 @@
+"""
+Offline Bundle API Router.
+
+This module serves packed offline bundles (see services.offline_bundle) built
+by execution/build_offline_bundle.py. Clients list the available full and
+delta bundles, then download one file or only the byte ranges they need.
+"""
+
+import os
+import re
+import logging
+from typing import Dict, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.responses import FileResponse, Response
+
+from ..services.offline_bundle import BundleReader, BundleError, BUNDLE_EXTENSION
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Settings
+OFFLINE_BUNDLE_DIR = os.environ.get(
+    "OFFLINE_BUNDLE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "bundles")
+)
+BUNDLE_NAME_PATTERN = re.compile(r'^[\w.-]+' + re.escape(BUNDLE_EXTENSION) + r'$')
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+CACHE_CONTROL = "public, max-age=86400"
+
+# Create router
+router = APIRouter(prefix="/api/bundle", tags=["Offline Bundle"])
+
+# Open readers keyed by path, invalidated when the file changes on disk
+_readers: Dict[str, Tuple[float, BundleReader]] = {}
+
+
+def get_reader(name: str) -> BundleReader:
+    """
+    Return a memory-mapped reader for a bundle in OFFLINE_BUNDLE_DIR.
+
+    Raises:
+        HTTPException: 404 if the name is invalid or the bundle does not exist
+    """
+    if not BUNDLE_NAME_PATTERN.match(name):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bundle not found")
+
+    path = os.path.join(OFFLINE_BUNDLE_DIR, name)
+    try:
+        mtime = os.stat(path).st_mtime
+    except FileNotFoundError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bundle not found")
+
+    cached = _readers.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        reader = BundleReader(path)
+    except BundleError as e:
+        logger.error(f"Invalid bundle {name}: {str(e)}")
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Bundle not found")
+
+    if cached:
+        cached[1].close()
+    _readers[path] = (mtime, reader)
+    return reader
+
+
+def parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """
+    Parse a single-range ``Range`` header into an inclusive (start, end) pair.
+
+    Returns:
+        None if the header should be ignored (multiple or malformed ranges)
+
+    Raises:
+        HTTPException: 416 if the range cannot be satisfied
+    """
+    match = RANGE_PATTERN.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+
+    first, last = match.groups()
+    if first:
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+    else:
+        start = max(0, size - int(last))
+        end = size - 1
+
+    if start >= size or start > end:
+        raise HTTPException(
+            status_code=416,
+            headers={"Content-Range": f"bytes */{size}"}
+        )
+    return start, end
+
+
+@router.get(
+    "",
+    summary="List offline bundles",
+    description="Returns the available full and delta bundles with their versions"
+)
+async def list_bundles():
+    """
+    List bundles in OFFLINE_BUNDLE_DIR.
+
+    Returns:
+        Bundle names, sizes and versions; delta bundles carry their base_version
+    """
+    bundles = []
+    if os.path.isdir(OFFLINE_BUNDLE_DIR):
+        for name in sorted(os.listdir(OFFLINE_BUNDLE_DIR)):
+            if not BUNDLE_NAME_PATTERN.match(name):
+                continue
+            try:
+                reader = get_reader(name)
+            except HTTPException:
+                continue
+            bundles.append({
+                "name": name,
+                "url": f"/api/bundle/{name}",
+                "size": reader.size,
+                "bundle_version": reader.bundle_version,
+                "base_version": reader.base_version if reader.is_delta else None,
+                "entries": reader.entry_count
+            })
+
+    return {"bundles": bundles, "success": True}
+
+
+@router.get(
+    "/{name}",
+    summary="Download an offline bundle",
+    description="Serves a bundle file; supports single byte-range requests",
+    responses={206: {"description": "Partial content for a Range request"}}
+)
+async def get_bundle(name: str, request: Request):
+    """
+    Download a whole bundle or a byte range of it.
+
+    Args:
+        name: Bundle file name, e.g. diagnosis-v2.kpack
+        request: Used to read the Range header
+
+    Returns:
+        The bundle (200) or the requested bytes (206)
+    """
+    reader = get_reader(name)
+    etag = f'"{reader.bundle_version}-{reader.base_version}-{reader.size}"'
+    headers = {
+        "Accept-Ranges": "bytes",
+        "ETag": etag,
+        "Cache-Control": CACHE_CONTROL
+    }
+
+    byte_range = None
+    range_header = request.headers.get("range")
+    if range_header and request.headers.get("if-range", etag) == etag:
+        byte_range = parse_range(range_header, reader.size)
+
+    if byte_range is None:
+        return FileResponse(
+            reader.path,
+            media_type="application/octet-stream",
+            headers=headers
+        )
+
+    start, end = byte_range
+    headers["Content-Range"] = f"bytes {start}-{end}/{reader.size}"
+    return Response(
+        content=bytes(reader.read_range(start, end + 1)),
+        status_code=status.HTTP_206_PARTIAL_CONTENT,
+        media_type="application/octet-stream",
+        headers=headers
+    )
@@ -0,0 +1,241 @@
+"""
+Diagnosis Ranking API Router.
+
+This module provides endpoints that rank candidate diagnoses for a crop and
+a set of observed symptoms, backed by the precomputed weight matrix in
+services.diagnosis_index.
+"""
+
+import logging
+from typing import List
+
+from fastapi import APIRouter, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.requests import ClientDisconnect
+from pydantic import BaseModel, Field
+
+from ..services.diagnosis_index import (
+    get_diagnosis_index,
+    DiagnosisIndexError,
+    DEFAULT_TOP_K
+)
+from ..services.survey_ingest import diagnose_survey
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Limits
+MAX_SYMPTOMS = 50
+MAX_BATCH_SIZE = 1000
+MAX_TOP_K = 20
+
+# Create router
+router = APIRouter(prefix="/api/diagnosis", tags=["Diagnosis"])
+
+
+# Request/Response Models
+class Observation(BaseModel):
+    """A crop and the symptoms observed on it."""
+    crop: str = Field(
+        ...,
+        description="Crop name, e.g. rice (unknown crops use the general rules)",
+        min_length=1,
+        max_length=50
+    )
+    symptoms: List[str] = Field(
+        ...,
+        description="Observed symptoms, e.g. yellowing_leaves or \"brown spots\"",
+        min_length=1,
+        max_length=MAX_SYMPTOMS
+    )
+
+
+class RankRequest(Observation):
+    """Request model for ranking a single observation."""
+    top_k: int = Field(
+        default=DEFAULT_TOP_K,
+        description="Maximum number of candidate diagnoses to return",
+        ge=1,
+        le=MAX_TOP_K
+    )
+
+
+class BatchRankRequest(BaseModel):
+    """Request model for ranking many observations in one call."""
+    observations: List[Observation] = Field(
+        ...,
+        description=f"Observations to rank (max {MAX_BATCH_SIZE})",
+        min_length=1,
+        max_length=MAX_BATCH_SIZE
+    )
+    top_k: int = Field(
+        default=DEFAULT_TOP_K,
+        description="Maximum number of candidate diagnoses per observation",
+        ge=1,
+        le=MAX_TOP_K
+    )
+
+
+class DiagnosisCandidate(BaseModel):
+    """A ranked candidate diagnosis."""
+    diagnosis: str
+    category: str
+    confidence: float = Field(..., description="Mean confidence over the observed symptoms (0-100)")
+    matched_symptoms: List[str]
+    management: str = ""
+    bangla_management: str = ""
+    source_url: str = ""
+    image_path: str = ""
+
+
+class RankResult(BaseModel):
+    """Ranking for one observation."""
+    crop: str
+    candidates: List[DiagnosisCandidate]
+    unknown_symptoms: List[str]
+
+
+class RankResponse(RankResult):
+    """Response model for the single ranking endpoint."""
+    success: bool = True
+
+
+class BatchRankResponse(BaseModel):
+    """Response model for the batch ranking endpoint."""
+    results: List[RankResult]
+    success: bool = True
+
+
+class UploadStreamingResponse(StreamingResponse):
+    """
+    StreamingResponse that leaves the request body to the endpoint.
+    
+    Starlette's StreamingResponse listens for client disconnects by calling
+    ``receive()``, which would swallow request body chunks we are still
+    reading. Disconnects surface through ``request.stream()`` instead.
+    Background tasks still run once the body has been sent.
+    """
+    
+    async def __call__(self, scope, receive, send) -> None:
+        try:
+            await self.stream_response(send)
+        except OSError:
+            # Same as Starlette: a broken connection while sending is a disconnect
+            raise ClientDisconnect()
+        if self.background is not None:
+            await self.background()
+
+
+def _load_index():
+    """Return the diagnosis index or raise 503 if the data is unavailable."""
+    try:
+        return get_diagnosis_index()
+    except DiagnosisIndexError as e:
+        logger.error(f"Diagnosis index unavailable: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail={"error": str(e), "success": False, "error_code": "INDEX_UNAVAILABLE"}
+        )
+
+
+@router.post(
+    "/rank",
+    response_model=RankResponse,
+    summary="Rank diagnoses for observed symptoms",
+    description="""
+    Rank candidate diagnoses for a crop and a set of observed symptoms.
+
+    Each diagnosis is scored by the mean CSV confidence over the observed
+    symptoms it explains; diagnoses supported by more of the symptoms rank higher.
+    """
+)
+async def rank_diagnoses(request: RankRequest) -> RankResponse:
+    """
+    Rank candidate diagnoses for one observation.
+
+    Args:
+        request: RankRequest with crop, symptoms and top_k
+
+    Returns:
+        RankResponse with candidates ordered best first
+    """
+    index = _load_index()
+    result = index.rank(request.crop, request.symptoms, request.top_k)
+    return RankResponse(**result)
+
+
+@router.post(
+    "/rank/batch",
+    response_model=BatchRankResponse,
+    summary="Rank diagnoses for many observations",
+    description=f"Rank up to {MAX_BATCH_SIZE} observations in one call; results keep request order"
+)
+async def rank_diagnoses_batch(request: BatchRankRequest) -> BatchRankResponse:
+    """
+    Rank candidate diagnoses for a batch of observations.
+
+    Args:
+        request: BatchRankRequest with observations and top_k
+
+    Returns:
+        BatchRankResponse with one result per observation
+    """
+    index = _load_index()
+    results = index.rank_batch(
+        [(o.crop, o.symptoms) for o in request.observations],
+        request.top_k
+    )
+    return BatchRankResponse(results=[RankResult(**r) for r in results])
+
+
+@router.get(
+    "/symptoms",
+    summary="List known symptoms per crop",
+    description="Returns the symptom vocabulary the ranking endpoints understand"
+)
+async def list_symptoms():
+    """
+    List the symptoms with at least one diagnosis, per crop.
+
+    Returns:
+        Mapping of crop to symptom names
+    """
+    index = _load_index()
+    return {"crops": index.crop_symptoms(), "success": True}
+
+
+@router.post(
+    "/bulk",
+    summary="Diagnose a field-survey CSV upload",
+    description=f"""
+    Upload a survey CSV as the raw request body (Content-Type: text/csv), e.g.
+    `curl -T survey.csv -H "Content-Type: text/csv" .../api/diagnosis/bulk`.
+
+    - Columns: **crop**, **symptom** (or **symptoms**, several separated by ";" or "|"),
+      **location**; other columns are echoed back in each result's `input`
+    - Rows are parsed while the upload is in progress and ranked in batches
+    - The response is NDJSON: one line per row, then a `{{"type": "summary"}}` line
+    """,
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}}
+)
+async def bulk_diagnose(
+    request: Request,
+    top_k: int = Query(default=3, ge=1, le=MAX_TOP_K, description="Candidates per row")
+):
+    """
+    Diagnose every row of an uploaded survey CSV, streaming NDJSON results.
+
+    Args:
+        request: The request whose body is the CSV upload
+        top_k: Maximum number of candidate diagnoses per row
+
+    Returns:
+        Streaming NDJSON response
+    """
+    index = _load_index()
+    return UploadStreamingResponse(
+        diagnose_survey(request.stream(), index, top_k),
+        media_type="application/x-ndjson"
+    )
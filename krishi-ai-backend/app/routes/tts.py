@@ -4,17 +4,25 @@ Text-to-Speech API Router.
 This module provides the FastAPI router for TTS endpoints.
 """
 
+import json
+import asyncio
 import logging
 from typing import Optional
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, HTTPException, WebSocket, WebSocketDisconnect, status
 from fastapi.responses import JSONResponse
 from pydantic import BaseModel, Field, field_validator
 
 from ..services.tts_service import (
     generate_speech,
     TTSError,
-    MAX_TEXT_LENGTH
+    MAX_TEXT_LENGTH,
+    TTS_MODEL,
+    TTS_VOICE
 )
+from ..services.audio_processing import POSTPROCESS_STATS
+from ..services.tts_providers import get_tts_router, GeminiTTSProvider
+from ..services.tts_cache import get_tts_cache
+from ..services.tts_streaming import SpeechStream, STREAM_CONNECTION_MAX_CHARS
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -33,6 +41,10 @@ class TTSRequest(BaseModel):
         min_length=1,
         max_length=MAX_TEXT_LENGTH
     )
+    postprocess: Optional[bool] = Field(
+        default=None,
+        description="Trim silence and normalize loudness (defaults to server setting)"
+    )
     
     @field_validator('text')
     @classmethod
@@ -86,6 +98,7 @@ class TTSErrorResponse(BaseModel):
     - **text**: The text to convert (max {MAX_TEXT_LENGTH} characters)
     - Returns base64-encoded PCM audio (24kHz sample rate, mono)
     - Markdown characters (*#_~`) are automatically removed from the text
+    - **postprocess**: Optionally trim leading/trailing silence and normalize loudness
     
     The audio can be played by:
     1. Decoding the base64 string to bytes
@@ -110,7 +123,7 @@ async def text_to_speech(request: TTSRequest) -> TTSSuccessResponse:
         logger.info(f"TTS request received for {len(request.text)} characters")
         
         # Generate speech
-        audio_base64 = await generate_speech(request.text)
+        audio_base64 = await generate_speech(request.text, request.postprocess)
         
         logger.info("TTS generation successful")
         
@@ -154,6 +167,106 @@ async def text_to_speech(request: TTSRequest) -> TTSSuccessResponse:
         )
 
 
+def _origin_allowed(origin: Optional[str]) -> bool:
+    """
+    Check a WebSocket Origin against ALLOWED_ORIGINS.
+    
+    CORSMiddleware does not apply to WebSockets, so browsers on other sites
+    could otherwise open the socket. Clients without an Origin header (native
+    apps, scripts) are not browsers and are allowed.
+    """
+    if origin is None:
+        return True
+    # Imported here: app.main imports this router
+    from ..main import ALLOWED_ORIGINS
+    return "*" in ALLOWED_ORIGINS or origin in ALLOWED_ORIGINS
+
+
+def _stream_error(error: str, error_code: Optional[str]) -> dict:
+    """Build a session-level error message for the TTS WebSocket."""
+    return {"type": "error", **TTSErrorResponse(error=error, error_code=error_code).model_dump()}
+
+
+@router.websocket("/ws")
+async def text_to_speech_stream(websocket: WebSocket):
+    """
+    Incremental TTS session for streamed text (e.g. chat answers).
+    
+    Client messages (JSON):
+        {"type": "text", "text": "..."}  - append text; may be sent many times
+        {"type": "end"}                  - the current utterance is complete
+    
+    Server messages (JSON), audio strictly in sentence order:
+        {"type": "audio", "seq": n, "text": "...", "audio": "<base64 PCM>"}
+        {"type": "error", "seq": n, "error": "...", "error_code": "..."}
+        {"type": "done", "sentences": n} - all audio for the utterance was sent
+    
+    Sentences are synthesized as soon as they are complete, while more text
+    is still arriving. The connection stays open for further utterances, up
+    to STREAM_CONNECTION_MAX_CHARS characters in total; browser connections
+    must come from ALLOWED_ORIGINS.
+    """
+    origin = websocket.headers.get("origin")
+    if not _origin_allowed(origin):
+        logger.warning(f"Rejected TTS stream from origin {origin}")
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    
+    await websocket.accept()
+    connection_chars = 0
+    
+    async def send_results(stream: SpeechStream):
+        sentences = 0
+        async for message in stream.results():
+            await websocket.send_json(message)
+            sentences += 1
+        await websocket.send_json({"type": "done", "sentences": sentences})
+    
+    stream = SpeechStream()
+    sender = asyncio.create_task(send_results(stream))
+    
+    try:
+        while True:
+            raw = await websocket.receive_text()
+            try:
+                message = json.loads(raw)
+                message_type = message.get("type")
+            except (ValueError, AttributeError):
+                await websocket.send_json(_stream_error("Messages must be JSON objects", "INVALID_MESSAGE"))
+                continue
+            
+            if message_type == "text":
+                text = str(message.get("text", ""))
+                connection_chars += len(text)
+                if connection_chars > STREAM_CONNECTION_MAX_CHARS:
+                    await websocket.send_json(_stream_error(
+                        f"Connection exceeded {STREAM_CONNECTION_MAX_CHARS} characters of text",
+                        "CONNECTION_LIMIT"
+                    ))
+                    await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+                    break
+                try:
+                    stream.feed(text)
+                except TTSError as e:
+                    await websocket.send_json(_stream_error(e.message, e.error_code))
+            elif message_type == "end":
+                stream.finish()
+                await sender
+                # Start a fresh utterance on the same connection
+                stream = SpeechStream()
+                sender = asyncio.create_task(send_results(stream))
+            else:
+                await websocket.send_json(_stream_error(f"Unknown message type: {message_type}", "INVALID_MESSAGE"))
+    
+    except WebSocketDisconnect:
+        logger.info("TTS stream client disconnected")
+    
+    finally:
+        sender.cancel()
+        await asyncio.gather(sender, return_exceptions=True)
+        await stream.aclose()
+
+
 # Health check endpoint for TTS service
 @router.get(
     "/health",
@@ -170,11 +283,16 @@ async def health_check():
     import os
     
     api_key_configured = bool(os.environ.get("GEMINI_API_KEY"))
+    tts_router = get_tts_router()
+    primary = next((p for p in tts_router.ranked() if isinstance(p, GeminiTTSProvider)), None)
     
     return {
         "status": "healthy" if api_key_configured else "degraded",
         "service": "tts",
         "api_key_configured": api_key_configured,
-        "model": "gemini-2.5-flash-preview-tts",
-        "voice": "Kore"
+        "model": primary.model if primary else TTS_MODEL,
+        "voice": primary.voice if primary else TTS_VOICE,
+        "providers": tts_router.snapshot(),
+        "postprocess": dict(POSTPROCESS_STATS),
+        "cache": get_tts_cache().snapshot()
     }
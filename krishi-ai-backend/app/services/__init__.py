@@ -7,23 +7,62 @@ This package contains service modules for various backend functionalities.
 from .tts_service import (
     generate_speech,
     generate_speech_sync,
+    encode_audio,
     sanitize_text,
     validate_text,
     TTSError,
     MAX_TEXT_LENGTH,
     TTS_MODEL,
     TTS_VOICE,
-    SAMPLE_RATE
+    SAMPLE_RATE,
+    TTS_POSTPROCESS
 )
+from .text_normalization import canonicalize_text, text_cache_key
+from .audio_processing import postprocess_pcm, POSTPROCESS_STATS
+from .tts_providers import (
+    TTSProvider,
+    GeminiTTSProvider,
+    LocalTTSProvider,
+    TTSRouter,
+    get_tts_router
+)
+from .tts_cache import TTSAudioCache, get_tts_cache
+from .tts_streaming import SentenceSplitter, SpeechStream
+from .offline_bundle import BundleReader, BundleWriter, BundleError
+from .diagnosis_index import DiagnosisIndex, DiagnosisIndexError, get_diagnosis_index
+from .survey_ingest import diagnose_survey, SurveyFormatError
 
 __all__ = [
     'generate_speech',
     'generate_speech_sync',
+    'encode_audio',
     'sanitize_text',
+    'canonicalize_text',
+    'text_cache_key',
     'validate_text',
     'TTSError',
     'MAX_TEXT_LENGTH',
     'TTS_MODEL',
     'TTS_VOICE',
-    'SAMPLE_RATE'
+    'SAMPLE_RATE',
+    'TTS_POSTPROCESS',
+    'postprocess_pcm',
+    'POSTPROCESS_STATS',
+    'TTSProvider',
+    'GeminiTTSProvider',
+    'LocalTTSProvider',
+    'TTSRouter',
+    'get_tts_router',
+    'TTSAudioCache',
+    'get_tts_cache',
+    'SentenceSplitter',
+    'SpeechStream',
+    'BundleReader',
+    'BundleWriter',
+    'BundleError',
+    'DiagnosisIndex',
+    'DiagnosisIndexError',
+    'get_diagnosis_index',
+    'diagnose_survey',
+    'SurveyFormatError'
 ]
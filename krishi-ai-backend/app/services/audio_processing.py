@@ -0,0 +1,232 @@
+"""
+Audio Post-Processing for TTS output.
+
+This module trims leading/trailing silence and normalizes loudness of the
+16-bit PCM audio returned by the Gemini TTS API. All operations are vectorized
+with NumPy over the whole buffer; there are no per-sample Python loops.
+"""
+
+import os
+import logging
+from typing import Dict, Optional, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is listed in requirements.txt
+    np = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Constants
+SAMPLE_WIDTH = 2  # int16 PCM
+FRAME_MS = 10
+SILENCE_THRESHOLD_DBFS = float(os.environ.get("TTS_SILENCE_THRESHOLD_DBFS", "-45"))
+SILENCE_PADDING_MS = int(os.environ.get("TTS_SILENCE_PADDING_MS", "60"))
+TARGET_RMS_DBFS = float(os.environ.get("TTS_TARGET_RMS_DBFS", "-20"))
+MAX_GAIN_DB = float(os.environ.get("TTS_MAX_GAIN_DB", "12"))
+PEAK_CEILING_DBFS = -1.0
+INT16_FULL_SCALE = 32768.0
+
+# Cumulative counters, exposed through the TTS health endpoint
+POSTPROCESS_STATS: Dict[str, int] = {
+    "requests": 0,
+    "bytes_in": 0,
+    "bytes_out": 0,
+    "bytes_saved": 0,
+    "silent_clips": 0,
+}
+
+
+def is_available() -> bool:
+    """Return True if NumPy is installed and post-processing can run."""
+    return np is not None
+
+
+def _db_to_linear(db: float) -> float:
+    """Convert a dBFS value to a linear amplitude relative to int16 full scale."""
+    return INT16_FULL_SCALE * (10.0 ** (db / 20.0))
+
+
+def frame_rms(samples: "np.ndarray", frame_length: int) -> "np.ndarray":
+    """
+    Compute the RMS energy of consecutive, non-overlapping frames.
+
+    Args:
+        samples: 1-D float array of PCM samples
+        frame_length: Number of samples per frame
+
+    Returns:
+        1-D array with one RMS value per frame (the last frame is zero-padded)
+    """
+    n_frames = -(-samples.size // frame_length)
+    padded = np.zeros(n_frames * frame_length, dtype=np.float64)
+    padded[:samples.size] = samples
+    frames = padded.reshape(n_frames, frame_length)
+    return np.sqrt(np.mean(frames * frames, axis=1))
+
+
+def voiced_region(
+    samples: "np.ndarray",
+    sample_rate: int,
+    threshold_dbfs: float = SILENCE_THRESHOLD_DBFS,
+    padding_ms: int = SILENCE_PADDING_MS
+) -> Optional[Tuple[int, int]]:
+    """
+    Locate the voiced part of a clip using a frame RMS-energy threshold.
+
+    Args:
+        samples: 1-D int16 array of PCM samples
+        sample_rate: Sample rate in Hz
+        threshold_dbfs: Frames below this RMS level count as silence
+        padding_ms: Amount of audio kept on either side of the voiced region
+
+    Returns:
+        (start, end) sample indices, or None if no frame rises above the threshold
+    """
+    if samples.size == 0:
+        return None
+
+    frame_length = max(1, sample_rate * FRAME_MS // 1000)
+    rms = frame_rms(samples.astype(np.float64), frame_length)
+    voiced = np.flatnonzero(rms >= _db_to_linear(threshold_dbfs))
+
+    if voiced.size == 0:
+        return None
+
+    padding = sample_rate * padding_ms // 1000
+    start = max(0, voiced[0] * frame_length - padding)
+    end = min(samples.size, (voiced[-1] + 1) * frame_length + padding)
+    return int(start), int(end)
+
+
+def trim_silence(
+    samples: "np.ndarray",
+    sample_rate: int,
+    threshold_dbfs: float = SILENCE_THRESHOLD_DBFS,
+    padding_ms: int = SILENCE_PADDING_MS
+) -> "np.ndarray":
+    """
+    Trim leading and trailing silence using a frame RMS-energy threshold.
+
+    Args:
+        samples: 1-D int16 array of PCM samples
+        sample_rate: Sample rate in Hz
+        threshold_dbfs: Frames below this RMS level count as silence
+        padding_ms: Amount of audio kept on either side of the voiced region
+
+    Returns:
+        View of ``samples`` covering the voiced region (unchanged if no frame
+        rises above the threshold, so a quiet clip is never dropped entirely)
+    """
+    region = voiced_region(samples, sample_rate, threshold_dbfs, padding_ms)
+    if region is None:
+        return samples
+    start, end = region
+    return samples[start:end]
+
+
+def normalize_loudness(
+    samples: "np.ndarray",
+    target_rms_dbfs: float = TARGET_RMS_DBFS,
+    peak_ceiling_dbfs: float = PEAK_CEILING_DBFS,
+    max_gain_db: float = MAX_GAIN_DB
+) -> "np.ndarray":
+    """
+    Scale audio to a target RMS level without exceeding a peak ceiling.
+
+    The gain is also capped at ``max_gain_db`` so a very quiet clip is not
+    boosted into audible hiss.
+
+    Args:
+        samples: 1-D int16 array of PCM samples
+        target_rms_dbfs: Desired RMS loudness in dBFS
+        peak_ceiling_dbfs: Maximum allowed peak level in dBFS
+        max_gain_db: Maximum amplification in dB
+
+    Returns:
+        New int16 array with the gain applied
+    """
+    if samples.size == 0:
+        return samples
+
+    floats = samples.astype(np.float64)
+    rms = np.sqrt(np.mean(floats * floats))
+    peak = np.max(np.abs(floats))
+
+    if rms == 0.0 or peak == 0.0:
+        return samples
+
+    gain = min(
+        _db_to_linear(target_rms_dbfs) / rms,
+        _db_to_linear(peak_ceiling_dbfs) / peak,
+        10.0 ** (max_gain_db / 20.0)
+    )
+    floats *= gain
+    np.clip(floats, -INT16_FULL_SCALE, INT16_FULL_SCALE - 1, out=floats)
+    return np.rint(floats).astype(np.int16)
+
+
+def postprocess_pcm(
+    audio_data: bytes,
+    sample_rate: int,
+    trim: bool = True,
+    normalize: bool = True
+) -> Tuple[bytes, Dict[str, int]]:
+    """
+    Trim silence from and normalize little-endian int16 mono PCM audio.
+
+    A clip with no frame above the silence threshold (near-silent or failed
+    synthesis) is passed through untouched rather than amplified.
+
+    Args:
+        audio_data: Raw PCM bytes as returned by the TTS API
+        sample_rate: Sample rate in Hz
+        trim: Whether to trim leading/trailing silence
+        normalize: Whether to normalize loudness
+
+    Returns:
+        Tuple of (processed_bytes, stats) where stats holds bytes_in,
+        bytes_out and bytes_saved
+    """
+    if np is None:
+        raise RuntimeError("NumPy is required for audio post-processing")
+
+    # Ignore a trailing odd byte rather than failing on a truncated buffer
+    usable = len(audio_data) - (len(audio_data) % SAMPLE_WIDTH)
+    samples = np.frombuffer(audio_data, dtype="<i2", count=usable // SAMPLE_WIDTH)
+
+    region = voiced_region(samples, sample_rate)
+    if region is None:
+        POSTPROCESS_STATS["silent_clips"] += 1
+    else:
+        if trim:
+            samples = samples[region[0]:region[1]]
+        if normalize:
+            samples = normalize_loudness(samples)
+
+    processed = samples.astype("<i2", copy=False).tobytes()
+    stats = {
+        "bytes_in": len(audio_data),
+        "bytes_out": len(processed),
+        "bytes_saved": len(audio_data) - len(processed),
+    }
+
+    POSTPROCESS_STATS["requests"] += 1
+    POSTPROCESS_STATS["bytes_in"] += stats["bytes_in"]
+    POSTPROCESS_STATS["bytes_out"] += stats["bytes_out"]
+    POSTPROCESS_STATS["bytes_saved"] += stats["bytes_saved"]
+
+    return processed, stats
+
+
+__all__ = [
+    'postprocess_pcm',
+    'trim_silence',
+    'voiced_region',
+    'normalize_loudness',
+    'frame_rms',
+    'is_available',
+    'POSTPROCESS_STATS'
+]
@@ -0,0 +1,228 @@
+"""
+Vectorized Symptom-to-Diagnosis Ranking.
+
+This module loads krishi-ai-backend/data/crop_diagnosis.csv once and precomputes a
+crop x symptom x diagnosis weight tensor from the ``confidence`` column.
+Ranking a set of observed symptoms for a crop is then a single
+matrix-vector product of the 0/1 symptom vector with that crop's
+symptom x diagnosis slice; batches of observations become one
+matrix-matrix product per crop.
+
+Rows for the "general" crop apply to every crop with a discount, mirroring
+the frontend rule-based analyzer's lower confidence for general matches.
+"""
+
+import os
+import csv
+import logging
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is listed in requirements.txt
+    np = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Settings (the CSV ships inside the backend tree so it is part of the image)
+DIAGNOSIS_CSV_PATH = os.environ.get(
+    "DIAGNOSIS_CSV_PATH",
+    os.path.join(
+        os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+        "data",
+        "crop_diagnosis.csv"
+    )
+)
+GENERAL_CROP = "general"
+GENERAL_WEIGHT = 0.8
+DEFAULT_TOP_K = 5
+DIAGNOSIS_FIELDS = ("diagnosis", "category", "management", "bangla_management", "source_url", "image_path")
+
+
+class DiagnosisIndexError(Exception):
+    """Raised when the diagnosis data cannot be loaded."""
+
+
+def normalize_key(value: str) -> str:
+    """Normalize a crop or symptom name, e.g. "Yellowing Leaves" -> "yellowing_leaves"."""
+    return "_".join(value.strip().lower().replace("-", " ").split())
+
+
+class DiagnosisIndex:
+    """
+    Precomputed diagnosis weights for fast multi-symptom ranking.
+
+    Attributes:
+        crops: Crop names; index i is the first axis of ``weights``
+        symptoms: Symptom names; index j is the second axis of ``weights``
+        diagnoses: Diagnosis metadata dicts; index k is the third axis
+        weights: float32 array of shape (crops, symptoms, diagnoses), 0..1
+    """
+
+    def __init__(self, rows: Iterable[Dict[str, str]]):
+        if np is None:
+            raise DiagnosisIndexError("NumPy is required for diagnosis ranking")
+
+        rows = [row for row in rows if row.get("crop") and row.get("symptom") and row.get("diagnosis")]
+        if not rows:
+            raise DiagnosisIndexError("No diagnosis records to index")
+
+        self.crops: List[str] = sorted({normalize_key(r["crop"]) for r in rows} | {GENERAL_CROP})
+        self.symptoms: List[str] = sorted({normalize_key(r["symptom"]) for r in rows})
+        self.diagnoses: List[Dict[str, Any]] = []
+        self.crop_ids = {crop: i for i, crop in enumerate(self.crops)}
+        self.symptom_ids = {symptom: j for j, symptom in enumerate(self.symptoms)}
+        diagnosis_ids: Dict[str, int] = {}
+
+        for row in rows:
+            name = row["diagnosis"].strip()
+            if name not in diagnosis_ids:
+                diagnosis_ids[name] = len(self.diagnoses)
+                self.diagnoses.append({field: (row.get(field) or "").strip() for field in DIAGNOSIS_FIELDS})
+
+        specific = np.zeros((len(self.crops), len(self.symptoms), len(self.diagnoses)), dtype=np.float32)
+        for row in rows:
+            confidence = float(row.get("confidence") or 50) / 100
+            i = self.crop_ids[normalize_key(row["crop"])]
+            j = self.symptom_ids[normalize_key(row["symptom"])]
+            k = diagnosis_ids[row["diagnosis"].strip()]
+            specific[i, j, k] = max(specific[i, j, k], confidence)
+
+        # Every crop also inherits the discounted general rules
+        general = specific[self.crop_ids[GENERAL_CROP]]
+        self.weights = np.maximum(specific, general * GENERAL_WEIGHT)
+        self.weights[self.crop_ids[GENERAL_CROP]] = general
+
+        logger.info(
+            f"Diagnosis index built: {len(self.crops)} crops x {len(self.symptoms)} symptoms "
+            f"x {len(self.diagnoses)} diagnoses"
+        )
+
+    @classmethod
+    def from_csv(cls, path: str = DIAGNOSIS_CSV_PATH) -> "DiagnosisIndex":
+        """Build the index from a crop_diagnosis.csv file."""
+        try:
+            with open(path, newline="", encoding="utf-8") as f:
+                return cls(csv.DictReader(f))
+        except OSError as e:
+            raise DiagnosisIndexError(f"Cannot read diagnosis data from {path}: {str(e)}")
+
+    def crop_symptoms(self) -> Dict[str, List[str]]:
+        """Return the symptoms that have at least one diagnosis, per crop."""
+        known = self.weights.max(axis=2) > 0
+        return {
+            crop: [self.symptoms[j] for j in np.flatnonzero(known[i])]
+            for i, crop in enumerate(self.crops)
+        }
+
+    def encode(
+        self,
+        observations: Sequence[Tuple[str, Sequence[str]]]
+    ) -> Tuple["np.ndarray", "np.ndarray", List[List[str]]]:
+        """
+        Encode observations as a crop index vector and a 0/1 symptom matrix.
+
+        Unknown crops fall back to the general rules; unknown symptoms are
+        returned per observation so callers can report them.
+        """
+        crop_idx = np.empty(len(observations), dtype=np.intp)
+        matrix = np.zeros((len(observations), len(self.symptoms)), dtype=np.float32)
+        unknown: List[List[str]] = []
+
+        for n, (crop, symptoms) in enumerate(observations):
+            crop_idx[n] = self.crop_ids.get(normalize_key(crop), self.crop_ids[GENERAL_CROP])
+            missing = []
+            for symptom in symptoms:
+                j = self.symptom_ids.get(normalize_key(symptom))
+                if j is None:
+                    missing.append(symptom)
+                else:
+                    matrix[n, j] = 1.0
+            unknown.append(missing)
+
+        return crop_idx, matrix, unknown
+
+    def score(self, crop_idx: "np.ndarray", matrix: "np.ndarray") -> "np.ndarray":
+        """
+        Score every diagnosis for every observation.
+
+        Returns:
+            Array of shape (observations, diagnoses): the mean confidence of
+            each diagnosis over the observed symptoms, in 0..1
+        """
+        scores = np.zeros((matrix.shape[0], len(self.diagnoses)), dtype=np.float32)
+        for crop in np.unique(crop_idx):
+            rows = crop_idx == crop
+            scores[rows] = matrix[rows] @ self.weights[crop]
+        observed = matrix.sum(axis=1, keepdims=True)
+        return scores / np.maximum(observed, 1.0)
+
+    def rank_batch(
+        self,
+        observations: Sequence[Tuple[str, Sequence[str]]],
+        top_k: int = DEFAULT_TOP_K
+    ) -> List[Dict[str, Any]]:
+        """
+        Rank candidate diagnoses for many (crop, symptoms) observations at once.
+
+        Args:
+            observations: Sequence of (crop, symptoms) pairs
+            top_k: Maximum number of candidates per observation
+
+        Returns:
+            One result dict per observation with ``candidates`` (best first)
+            and ``unknown_symptoms``
+        """
+        if not observations:
+            return []
+
+        crop_idx, matrix, unknown = self.encode(observations)
+        scores = self.score(crop_idx, matrix)
+        top_k = max(1, min(top_k, len(self.diagnoses)))
+        order = np.argsort(-scores, axis=1, kind="stable")[:, :top_k]
+
+        results = []
+        for n in range(len(observations)):
+            observed = np.flatnonzero(matrix[n])
+            candidates = []
+            for k in order[n]:
+                if scores[n, k] <= 0:
+                    break
+                supporting = observed[self.weights[crop_idx[n], observed, k] > 0]
+                candidates.append({
+                    **self.diagnoses[k],
+                    "confidence": round(float(scores[n, k]) * 100, 1),
+                    "matched_symptoms": [self.symptoms[j] for j in supporting]
+                })
+            results.append({
+                "crop": self.crops[crop_idx[n]],
+                "candidates": candidates,
+                "unknown_symptoms": unknown[n]
+            })
+        return results
+
+    def rank(self, crop: str, symptoms: Sequence[str], top_k: int = DEFAULT_TOP_K) -> Dict[str, Any]:
+        """Rank candidate diagnoses for a single observation."""
+        return self.rank_batch([(crop, symptoms)], top_k)[0]
+
+
+_index: Optional[DiagnosisIndex] = None
+
+
+def get_diagnosis_index() -> DiagnosisIndex:
+    """Return the process-wide diagnosis index, building it on first use."""
+    global _index
+    if _index is None:
+        _index = DiagnosisIndex.from_csv()
+    return _index
+
+
+__all__ = [
+    'DiagnosisIndex',
+    'DiagnosisIndexError',
+    'get_diagnosis_index',
+    'normalize_key',
+    'DEFAULT_TOP_K'
+]
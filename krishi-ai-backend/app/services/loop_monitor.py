@@ -0,0 +1,193 @@
+"""
+Event Loop Lag Monitor.
+
+This module measures how late the asyncio event loop runs a periodic callback
+(scheduling lag) so blocking calls inside async handlers show up as a metric
+instead of as unexplained latency spikes. A watchdog thread notices when the
+loop stops ticking for longer than a threshold and captures the stack of the
+loop thread and the task that was running, i.e. the code doing the blocking.
+"""
+
+import os
+import sys
+import time
+import asyncio
+import logging
+import threading
+import traceback
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Settings
+LOOP_MONITOR_ENABLED = os.environ.get("LOOP_MONITOR_ENABLED", "True").lower() == "true"
+LOOP_MONITOR_INTERVAL = float(os.environ.get("LOOP_MONITOR_INTERVAL", "0.1"))
+LOOP_LAG_THRESHOLD_MS = float(os.environ.get("LOOP_LAG_THRESHOLD_MS", "100"))
+SAMPLE_WINDOW = 600
+MAX_BLOCK_EVENTS = 20
+MAX_STACK_FRAMES = 30
+
+
+class EventLoopLagMonitor:
+    """
+    Samples event loop scheduling lag and captures stacks of blocking code.
+
+    Args:
+        interval: Seconds between lag samples
+        threshold_ms: Lag above which the loop counts as blocked
+    """
+
+    def __init__(
+        self,
+        interval: float = LOOP_MONITOR_INTERVAL,
+        threshold_ms: float = LOOP_LAG_THRESHOLD_MS
+    ):
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.samples: Deque[float] = deque(maxlen=SAMPLE_WINDOW)
+        self.block_events: Deque[Dict[str, Any]] = deque(maxlen=MAX_BLOCK_EVENTS)
+        self.max_lag_ms = 0.0
+        self.blocked_total = 0
+        self._heartbeat = time.monotonic()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stopped = threading.Event()
+
+    def start(self) -> None:
+        """Start sampling on the running loop and launch the watchdog thread."""
+        if self._task is not None:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stopped.clear()
+        self._task = self._loop.create_task(self._sample(), name="event-loop-lag-monitor")
+        self._watchdog = threading.Thread(
+            target=self._watch,
+            name="event-loop-watchdog",
+            daemon=True
+        )
+        self._watchdog.start()
+        logger.info(
+            f"Event loop lag monitor started (interval {self.interval}s, "
+            f"threshold {self.threshold_ms:.0f}ms)"
+        )
+
+    async def stop(self) -> None:
+        """Stop sampling and the watchdog thread."""
+        self._stopped.set()
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self._watchdog is not None:
+            self._watchdog.join(timeout=1.0)
+            self._watchdog = None
+
+    async def _sample(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            expected = loop.time() + self.interval
+            await asyncio.sleep(self.interval)
+            lag_ms = max(0.0, (loop.time() - expected) * 1000)
+            self._heartbeat = time.monotonic()
+            self.samples.append(lag_ms)
+            self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+            if lag_ms >= self.threshold_ms:
+                self.blocked_total += 1
+
+    def _watch(self) -> None:
+        """Watchdog thread: capture the loop thread's stack while it is blocked."""
+        threshold = self.threshold_ms / 1000
+        check_interval = max(threshold / 2, 0.01)
+        reported_heartbeat = None
+
+        while not self._stopped.wait(check_interval):
+            heartbeat = self._heartbeat
+            stalled = time.monotonic() - heartbeat - self.interval
+            # Report each stall once, however long it lasts
+            if stalled >= threshold and heartbeat != reported_heartbeat:
+                reported_heartbeat = heartbeat
+                self._capture_block(stalled * 1000)
+
+    def _capture_block(self, stalled_ms: float) -> None:
+        frame = sys._current_frames().get(self._loop_thread_id)
+        stack = traceback.format_stack(frame, limit=MAX_STACK_FRAMES) if frame else []
+
+        task_name = None
+        coroutine = None
+        try:
+            task = asyncio.current_task(self._loop)
+        except RuntimeError:
+            task = None
+        if task is not None:
+            task_name = task.get_name()
+            coroutine = repr(task.get_coro())
+
+        event = {
+            "timestamp": time.time(),
+            "stalled_ms": round(stalled_ms, 1),
+            "task": task_name,
+            "coroutine": coroutine,
+            "stack": [line.rstrip() for line in stack]
+        }
+        self.block_events.append(event)
+        logger.warning(
+            f"Event loop blocked for {stalled_ms:.0f}ms+ in task {task_name} ({coroutine}):\n"
+            + "".join(stack)
+        )
+
+    def percentile(self, q: float) -> float:
+        """Return the q-th percentile (0-100) of recent lag samples in ms."""
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        position = min(len(ordered) - 1, int(round(q / 100 * (len(ordered) - 1))))
+        return ordered[position]
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return current lag statistics and recent blocking events."""
+        return {
+            "running": self._task is not None,
+            "interval_s": self.interval,
+            "threshold_ms": self.threshold_ms,
+            "lag_ms": round(self.samples[-1], 2) if self.samples else 0.0,
+            "lag_p50_ms": round(self.percentile(50), 2),
+            "lag_p99_ms": round(self.percentile(99), 2),
+            "lag_max_ms": round(self.max_lag_ms, 2),
+            "blocked_total": self.blocked_total,
+            "block_events": list(self.block_events)
+        }
+
+    def prometheus_lines(self, prefix: str = "krishi_event_loop") -> List[str]:
+        """Render the lag metrics in Prometheus text exposition format."""
+        return [
+            f"# HELP {prefix}_lag_seconds Most recent event loop scheduling lag.",
+            f"# TYPE {prefix}_lag_seconds gauge",
+            f"{prefix}_lag_seconds {(self.samples[-1] if self.samples else 0.0) / 1000:.6f}",
+            f"# HELP {prefix}_lag_p99_seconds 99th percentile lag over the recent window.",
+            f"# TYPE {prefix}_lag_p99_seconds gauge",
+            f"{prefix}_lag_p99_seconds {self.percentile(99) / 1000:.6f}",
+            f"# HELP {prefix}_lag_max_seconds Maximum lag since startup.",
+            f"# TYPE {prefix}_lag_max_seconds gauge",
+            f"{prefix}_lag_max_seconds {self.max_lag_ms / 1000:.6f}",
+            f"# HELP {prefix}_blocked_total Samples with lag above the threshold.",
+            f"# TYPE {prefix}_blocked_total counter",
+            f"{prefix}_blocked_total {self.blocked_total}",
+        ]
+
+
+# Process-wide monitor used by the application
+loop_monitor = EventLoopLagMonitor()
+
+
+__all__ = [
+    'EventLoopLagMonitor',
+    'loop_monitor',
+    'LOOP_MONITOR_ENABLED'
+]
@@ -0,0 +1,335 @@
+"""
+Packed Offline Bundle Format.
+
+A bundle packs diagnosis records, a search index and pre-rendered advisory
+audio into one file that clients can download once and read with zero-copy
+lookups (mmap on the backend, a single ArrayBuffer in the service worker or
+Expo app).
+
+Layout (all integers little-endian)::
+
+    header   HEADER_STRUCT, HEADER_SIZE bytes
+    index    entry_count fixed-size ENTRY_STRUCT entries, sorted by key bytes
+    keys     UTF-8 key strings referenced by the index
+    payloads contiguous entry payloads, each aligned to PAYLOAD_ALIGNMENT
+
+Because index entries have a fixed size and are sorted, a client can binary
+search the index directly in the mapped buffer. A delta bundle carries only
+entries that changed since ``base_version`` plus tombstones for removed keys.
+"""
+
+import os
+import mmap
+import struct
+import zlib
+import logging
+import weakref
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Format constants
+MAGIC = b"KAPK"
+FORMAT_VERSION = 1
+PAYLOAD_ALIGNMENT = 8
+BUNDLE_EXTENSION = ".kpack"
+
+# magic, format_version, flags, bundle_version, base_version, entry_count,
+# keys_offset, keys_length, data_offset, data_length
+HEADER_STRUCT = struct.Struct("<4sHHIIIQQQQ")
+HEADER_SIZE = 64
+
+# kind, flags, key_length, key_offset, payload_offset, payload_length, crc32
+ENTRY_STRUCT = struct.Struct("<BBHIQII")
+
+# Bundle flags
+FLAG_DELTA = 0x1
+
+# Entry kinds
+KIND_RECORD = 1
+KIND_INDEX = 2
+KIND_AUDIO = 3
+
+# Entry flags
+ENTRY_DELETED = 0x1
+
+
+class BundleError(Exception):
+    """Raised for malformed or incompatible bundle files."""
+
+
+class BundleEntry(NamedTuple):
+    """One index entry; offsets are absolute positions in the bundle file."""
+    key: str
+    kind: int
+    flags: int
+    offset: int
+    length: int
+    crc32: int
+
+    @property
+    def deleted(self) -> bool:
+        return bool(self.flags & ENTRY_DELETED)
+
+
+def _align(value: int) -> int:
+    return -(-value // PAYLOAD_ALIGNMENT) * PAYLOAD_ALIGNMENT
+
+
+class BundleWriter:
+    """
+    Collects entries in memory and writes them out as a bundle.
+
+    Args:
+        bundle_version: Monotonic version of the bundle contents
+        base_version: Version a delta applies on top of (0 for a full bundle)
+    """
+
+    def __init__(self, bundle_version: int, base_version: int = 0):
+        self.bundle_version = bundle_version
+        self.base_version = base_version
+        self._entries: Dict[str, Tuple[int, int, bytes]] = {}
+
+    def add(self, key: str, kind: int, payload: bytes) -> None:
+        """Add or replace an entry."""
+        self._entries[key] = (kind, 0, bytes(payload))
+
+    def delete(self, key: str, kind: int) -> None:
+        """Record a tombstone for a key removed since the base bundle."""
+        self._entries[key] = (kind, ENTRY_DELETED, b"")
+
+    def items(self) -> Iterator[Tuple[str, int, bytes]]:
+        """Iterate (key, kind, payload) for live entries."""
+        for key, (kind, flags, payload) in self._entries.items():
+            if not flags & ENTRY_DELETED:
+                yield key, kind, payload
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def to_bytes(self) -> bytes:
+        """Serialize the bundle."""
+        items = sorted(
+            ((key.encode("utf-8"), value) for key, value in self._entries.items()),
+            key=lambda item: item[0]
+        )
+
+        index_length = len(items) * ENTRY_STRUCT.size
+        keys_offset = HEADER_SIZE + index_length
+        keys_blob = b"".join(key for key, _ in items)
+        data_offset = _align(keys_offset + len(keys_blob))
+
+        index = bytearray()
+        data = bytearray()
+        key_position = 0
+        for key, (kind, flags, payload) in items:
+            data.extend(b"\0" * (_align(len(data)) - len(data)))
+            index.extend(ENTRY_STRUCT.pack(
+                kind,
+                flags,
+                len(key),
+                keys_offset + key_position,
+                data_offset + len(data),
+                len(payload),
+                zlib.crc32(payload)
+            ))
+            data.extend(payload)
+            key_position += len(key)
+
+        header = HEADER_STRUCT.pack(
+            MAGIC,
+            FORMAT_VERSION,
+            FLAG_DELTA if self.base_version else 0,
+            self.bundle_version,
+            self.base_version,
+            len(items),
+            keys_offset,
+            len(keys_blob),
+            data_offset,
+            len(data)
+        ).ljust(HEADER_SIZE, b"\0")
+
+        padding = b"\0" * (data_offset - keys_offset - len(keys_blob))
+        return header + bytes(index) + keys_blob + padding + bytes(data)
+
+    def write(self, path: str) -> int:
+        """Write the bundle atomically and return its size in bytes."""
+        blob = self.to_bytes()
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, path)
+        return len(blob)
+
+
+class BundleReader:
+    """
+    Memory-mapped, zero-copy reader for a bundle file.
+
+    ``get`` returns a ``memoryview`` into the mapping; it stays valid until
+    the reader is closed. Copy it with ``bytes()`` to keep it longer.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise BundleError(f"Bundle is empty: {path}")
+        self._view = memoryview(self._mmap)
+        # Views handed out by get/read_range, released on close
+        self._exports: "weakref.WeakSet[memoryview]" = weakref.WeakSet()
+
+        if len(self._mmap) < HEADER_SIZE:
+            self.close()
+            raise BundleError(f"Bundle is truncated: {path}")
+
+        (
+            magic, format_version, self.flags, self.bundle_version,
+            self.base_version, self.entry_count, self.keys_offset,
+            self.keys_length, self.data_offset, self.data_length
+        ) = HEADER_STRUCT.unpack_from(self._mmap, 0)
+
+        if magic != MAGIC:
+            self.close()
+            raise BundleError(f"Not a bundle file: {path}")
+        if format_version != FORMAT_VERSION:
+            self.close()
+            raise BundleError(f"Unsupported bundle format version {format_version}")
+        if self.data_offset + self.data_length > len(self._mmap):
+            self.close()
+            raise BundleError(f"Bundle is truncated: {path}")
+
+    @property
+    def is_delta(self) -> bool:
+        return bool(self.flags & FLAG_DELTA)
+
+    @property
+    def size(self) -> int:
+        return len(self._mmap)
+
+    def _entry_at(self, position: int) -> BundleEntry:
+        kind, flags, key_length, key_offset, offset, length, crc = ENTRY_STRUCT.unpack_from(
+            self._mmap, HEADER_SIZE + position * ENTRY_STRUCT.size
+        )
+        key = bytes(self._view[key_offset:key_offset + key_length]).decode("utf-8")
+        return BundleEntry(key, kind, flags, offset, length, crc)
+
+    def _key_at(self, position: int) -> memoryview:
+        _, _, key_length, key_offset, _, _, _ = ENTRY_STRUCT.unpack_from(
+            self._mmap, HEADER_SIZE + position * ENTRY_STRUCT.size
+        )
+        return self._view[key_offset:key_offset + key_length]
+
+    def find(self, key: str) -> Optional[BundleEntry]:
+        """Binary search the index for a key."""
+        target = key.encode("utf-8")
+        low, high = 0, self.entry_count
+        while low < high:
+            middle = (low + high) // 2
+            if bytes(self._key_at(middle)) < target:
+                low = middle + 1
+            else:
+                high = middle
+        if low < self.entry_count and bytes(self._key_at(low)) == target:
+            return self._entry_at(low)
+        return None
+
+    def get(self, key: str) -> Optional[memoryview]:
+        """Return a zero-copy view of a live entry's payload, or None."""
+        entry = self.find(key)
+        if entry is None or entry.deleted:
+            return None
+        return self._export(entry.offset, entry.offset + entry.length)
+
+    def _export(self, start: int, end: int) -> memoryview:
+        view = self._view[start:end]
+        self._exports.add(view)
+        return view
+
+    def entries(self, prefix: str = "") -> Iterator[BundleEntry]:
+        """Iterate index entries in key order, optionally filtered by prefix."""
+        for position in range(self.entry_count):
+            entry = self._entry_at(position)
+            if entry.key.startswith(prefix):
+                yield entry
+
+    def read_range(self, start: int, end: int) -> memoryview:
+        """Return a zero-copy view of the raw bytes [start, end)."""
+        return self._export(start, end)
+
+    def verify(self) -> List[str]:
+        """Return keys whose payload CRC does not match the index."""
+        return [
+            entry.key for entry in self.entries()
+            if not entry.deleted
+            and zlib.crc32(self._view[entry.offset:entry.offset + entry.length]) != entry.crc32
+        ]
+
+    def close(self) -> None:
+        """Release the mapping; views returned by ``get`` become invalid."""
+        for view in list(self._exports):
+            try:
+                view.release()
+            except BufferError:
+                # Re-exported by the caller (e.g. np.frombuffer); left to the GC
+                pass
+        self._exports.clear()
+        if self._view is not None:
+            self._view.release()
+            self._view = None
+        if not self._mmap.closed:
+            try:
+                self._mmap.close()
+            except BufferError:
+                logger.warning(f"Bundle {self.path} still has live views; unmapped when they are freed")
+        self._file.close()
+
+    def __enter__(self) -> "BundleReader":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def build_delta(base: BundleReader, current: BundleWriter, bundle_version: int) -> BundleWriter:
+    """
+    Build a delta bundle with the entries of ``current`` that differ from ``base``.
+
+    Args:
+        base: Reader for the bundle clients already have
+        current: Writer holding the complete new contents
+        bundle_version: Version of the new contents
+
+    Returns:
+        Writer containing changed/new entries and tombstones for removed keys
+    """
+    delta = BundleWriter(bundle_version, base_version=base.bundle_version)
+    base_entries = {entry.key: entry for entry in base.entries() if not entry.deleted}
+
+    for key, kind, payload in current.items():
+        entry = base_entries.pop(key, None)
+        if entry is None or entry.length != len(payload) or entry.crc32 != zlib.crc32(payload):
+            delta.add(key, kind, payload)
+
+    for key, entry in base_entries.items():
+        delta.delete(key, entry.kind)
+
+    return delta
+
+
+__all__ = [
+    'BundleWriter',
+    'BundleReader',
+    'BundleEntry',
+    'BundleError',
+    'build_delta',
+    'BUNDLE_EXTENSION',
+    'KIND_RECORD',
+    'KIND_INDEX',
+    'KIND_AUDIO'
+]
@@ -0,0 +1,225 @@
+"""
+Bulk Field-Survey Diagnosis.
+
+This module parses a survey CSV while it is still being uploaded and runs the
+rows through the diagnosis index in batches, producing NDJSON result lines as
+it goes. Only the current network chunk, one partial record and one batch are
+held in memory at a time, so uploads of any size use bounded memory and the
+first results are available long before the upload finishes.
+
+Expected columns (case-insensitive, extra columns are echoed back as-is):
+    crop, symptom (or symptoms, several separated by ";" or "|"), location
+"""
+
+import os
+import csv
+import json
+import codecs
+import logging
+import re
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from starlette.requests import ClientDisconnect
+
+from .diagnosis_index import DiagnosisIndex, DEFAULT_TOP_K
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Settings
+BULK_BATCH_SIZE = int(os.environ.get("BULK_BATCH_SIZE", "500"))
+MAX_RECORD_BYTES = 64 * 1024
+SYMPTOM_SEPARATOR = re.compile(r'[;|]')
+SYMPTOM_COLUMNS = ("symptoms", "symptom")
+
+
+class SurveyFormatError(Exception):
+    """Raised when the uploaded survey cannot be parsed."""
+
+
+class CSVRecordStream:
+    """
+    Incremental CSV parser for byte chunks.
+
+    Lines are accumulated until their double quotes balance, so a quoted field
+    containing newlines is only parsed once the whole record has arrived.
+    """
+
+    def __init__(self):
+        self._decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+        self._partial_line = ""
+        self._record_lines: List[str] = []
+        self._quotes = 0
+
+    def feed(self, chunk: bytes, final: bool = False) -> List[List[str]]:
+        """
+        Add a chunk and return the CSV records it completed.
+
+        Raises:
+            SurveyFormatError: If a single record grows beyond MAX_RECORD_BYTES
+        """
+        text = self._partial_line + self._decoder.decode(chunk, final=final)
+        lines = text.splitlines(keepends=True)
+
+        if lines and not final and not lines[-1].endswith(("\n", "\r")):
+            self._partial_line = lines.pop()
+        else:
+            self._partial_line = ""
+        if len(self._partial_line) > MAX_RECORD_BYTES:
+            raise SurveyFormatError(f"Record exceeds {MAX_RECORD_BYTES} bytes")
+
+        records = []
+        for line in lines:
+            self._record_lines.append(line)
+            self._quotes += line.count('"')
+            if self._quotes % 2 == 0:
+                records.extend(csv.reader(["".join(self._record_lines)]))
+                self._record_lines = []
+                self._quotes = 0
+            elif sum(map(len, self._record_lines)) > MAX_RECORD_BYTES:
+                raise SurveyFormatError(f"Record exceeds {MAX_RECORD_BYTES} bytes")
+
+        if final and self._record_lines:
+            raise SurveyFormatError("Unterminated quoted field at end of upload")
+        return [record for record in records if any(field.strip() for field in record)]
+
+
+def parse_observation(row: Dict[str, str]) -> Tuple[str, List[str]]:
+    """Extract (crop, symptoms) from a survey row keyed by lowercase column name."""
+    symptoms: List[str] = []
+    for column in SYMPTOM_COLUMNS:
+        symptoms.extend(s.strip() for s in SYMPTOM_SEPARATOR.split(row.get(column) or "") if s.strip())
+    return (row.get("crop") or "").strip(), symptoms
+
+
+def _diagnose_batch(
+    index: DiagnosisIndex,
+    batch: List[Tuple[int, Dict[str, str]]],
+    top_k: int
+) -> List[Dict[str, Any]]:
+    """Rank a batch of survey rows; rows without crop or symptoms become errors."""
+    lines: List[Optional[Dict[str, Any]]] = []
+    valid = []
+
+    for row_number, row in batch:
+        crop, symptoms = parse_observation(row)
+        if not crop or not symptoms:
+            lines.append({"row": row_number, "error": "Row needs a crop and at least one symptom"})
+        else:
+            valid.append((len(lines), row_number, row, crop, symptoms))
+            lines.append(None)
+
+    results = index.rank_batch([(crop, symptoms) for _, _, _, crop, symptoms in valid], top_k)
+    for (position, row_number, row, _, _), result in zip(valid, results):
+        lines[position] = {
+            "row": row_number,
+            "input": row,
+            "crop": result["crop"],
+            "candidates": [
+                {
+                    "diagnosis": c["diagnosis"],
+                    "category": c["category"],
+                    "confidence": c["confidence"],
+                    "matched_symptoms": c["matched_symptoms"]
+                }
+                for c in result["candidates"]
+            ],
+            "unknown_symptoms": result["unknown_symptoms"]
+        }
+
+    return lines
+
+
+async def diagnose_survey(
+    chunks: AsyncIterator[bytes],
+    index: DiagnosisIndex,
+    top_k: int = DEFAULT_TOP_K,
+    batch_size: int = BULK_BATCH_SIZE
+) -> AsyncIterator[str]:
+    """
+    Stream NDJSON diagnosis results for a CSV survey upload.
+
+    A batch is ranked when it is full or when the current network chunk has
+    been parsed, whichever comes first. The last line is a summary object
+    with ``"type": "summary"``; a fatal parse error ends the stream with an
+    ``"type": "error"`` line. A client disconnecting mid-upload ends the
+    stream quietly.
+
+    Args:
+        chunks: The raw upload body as an async iterator of bytes
+        index: Diagnosis index used for ranking
+        top_k: Candidates per row
+        batch_size: Maximum rows ranked together
+
+    Yields:
+        NDJSON lines (each ending in a newline)
+    """
+    parser = CSVRecordStream()
+    header: Optional[List[str]] = None
+    batch: List[Tuple[int, Dict[str, str]]] = []
+    row_number = 0
+    rows = 0
+    errors = 0
+
+    def dump(obj: Dict[str, Any]) -> str:
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    async def records() -> AsyncIterator[Optional[List[str]]]:
+        async for chunk in chunks:
+            for record in parser.feed(chunk):
+                yield record
+            # Chunk boundary: let the caller flush a partial batch
+            yield None
+        for record in parser.feed(b"", final=True):
+            yield record
+        yield None
+
+    try:
+        async for record in records():
+            if record is not None:
+                if header is None:
+                    header = [column.strip().lower() for column in record]
+                    if "crop" not in header or not any(c in header for c in SYMPTOM_COLUMNS):
+                        raise SurveyFormatError("CSV header must include crop and symptom columns")
+                    continue
+                row_number += 1
+                batch.append((row_number, dict(zip(header, record))))
+                if len(batch) < batch_size:
+                    continue
+            if not batch:
+                continue
+
+            out = []
+            for line in _diagnose_batch(index, batch, top_k):
+                rows += 1
+                errors += "error" in line
+                out.append(dump(line))
+            batch = []
+            yield "".join(out)
+
+    except SurveyFormatError as e:
+        logger.warning(f"Survey upload rejected at row {row_number}: {str(e)}")
+        yield dump({"type": "error", "row": row_number, "error": str(e)})
+        return
+
+    except ClientDisconnect:
+        # Nobody is left to read the results
+        logger.info(f"Survey upload disconnected after {row_number} rows")
+        return
+
+    if header is None:
+        yield dump({"type": "error", "row": 0, "error": "Upload is empty"})
+        return
+
+    logger.info(f"Survey processed: {rows} rows, {errors} errors")
+    yield dump({"type": "summary", "rows": rows, "errors": errors})
+
+
+__all__ = [
+    'CSVRecordStream',
+    'SurveyFormatError',
+    'diagnose_survey',
+    'parse_observation',
+    'BULK_BATCH_SIZE'
+]
@@ -0,0 +1,104 @@
+"""
+Canonical text normalization for TTS inputs.
+
+Texts that only differ in Unicode normalization form, Bangla vs. ASCII digits,
+stray zero-width characters or punctuation variants sound identical once synthesized.
+This module folds those variants into a single canonical form so that cache
+and dedup keys computed from the result collide as they should.
+
+All character-level rewrites use translation tables built once at import time,
+so canonicalization is a handful of C-level passes over the string.
+"""
+
+import hashlib
+import re
+import unicodedata
+from typing import Dict
+
+# Bangla digits (U+09E6..U+09EF) fold to ASCII digits
+BANGLA_DIGITS = "০১২৩৪৫৬৭৮৯"
+DIGIT_TABLE: Dict[int, str] = {ord(bn): str(i) for i, bn in enumerate(BANGLA_DIGITS)}
+
+# Invisible characters that never change pronunciation: ZWNJ only affects glyph
+# shaping, the rest are formatting artifacts. ZWJ is handled separately below.
+INVISIBLE_TABLE: Dict[int, None] = dict.fromkeys(map(ord, [
+    "\u200c",  # ZERO WIDTH NON-JOINER
+    "\u200b",  # ZERO WIDTH SPACE
+    "\u2060",  # WORD JOINER
+    "\ufeff",  # BYTE ORDER MARK
+    "\u00ad",  # SOFT HYPHEN
+]))
+
+# Typographic punctuation variants fold to their plain equivalents
+PUNCTUATION_TABLE: Dict[int, str] = {
+    ord("‘"): "'", ord("’"): "'", ord("‚"): "'", ord("′"): "'",
+    ord("“"): '"', ord("”"): '"', ord("„"): '"', ord("″"): '"',
+    ord("«"): '"', ord("»"): '"',
+    ord("‐"): "-", ord("‑"): "-", ord("‒"): "-", ord("–"): "-",
+    ord("—"): "-", ord("―"): "-", ord("−"): "-",
+    ord("…"): "...",
+    ord("，"): ",", ord("："): ":", ord("；"): ";",
+    ord("！"): "!", ord("？"): "?",
+    ord("॥"): "।",  # DEVANAGARI DOUBLE DANDA -> DANDA (Bangla dari)
+    ord("৷"): "।",  # BENGALI CURRENCY NUMERATOR FOUR, often typed as a dari
+    ord("\u00a0"): " ", ord("\u2009"): " ", ord("\u202f"): " ",  # NBSP / thin spaces
+}
+
+CANONICAL_TABLE: Dict[int, object] = {**DIGIT_TABLE, **INVISIBLE_TABLE, **PUNCTUATION_TABLE}
+
+# ZWJ is dropped except in ra + ZWJ + hasant, which spells ra with ya-phala
+# ("র‍্যাব", rya) rather than reph ("কার্য", rjo); removing it changes the word
+STRAY_ZWJ_PATTERN = re.compile('(?<!\u09b0)\u200d|\u200d(?!\u09cd)')
+
+# Runs of the same sentence punctuation ("!!!", "।।") collapse to one mark;
+# "..." is kept because it reads as a pause
+REPEATED_PUNCTUATION_PATTERN = re.compile(r'([!?,;:।])\1+')
+SPACE_BEFORE_PUNCTUATION_PATTERN = re.compile(r'\s+([!?,;:.।])')
+
+
+def canonicalize_text(text: str) -> str:
+    """
+    Fold a text into its canonical form for synthesis and cache keys.
+
+    Applies NFC normalization, Bangla-to-ASCII digit folding, removal of
+    ZWNJ, stray ZWJ and other invisible characters, punctuation normalization
+    and whitespace collapsing. A ZWJ that forms the ra + ya-phala ligature is
+    kept, since it changes pronunciation.
+
+    Args:
+        text: The input text
+
+    Returns:
+        Canonical text
+    """
+    canonical = STRAY_ZWJ_PATTERN.sub('', unicodedata.normalize("NFC", text))
+    canonical = canonical.translate(CANONICAL_TABLE)
+    canonical = REPEATED_PUNCTUATION_PATTERN.sub(r'\1', canonical)
+    canonical = ' '.join(canonical.split())
+    canonical = SPACE_BEFORE_PUNCTUATION_PATTERN.sub(r'\1', canonical)
+    return canonical
+
+
+def text_cache_key(text: str, *qualifiers: str) -> str:
+    """
+    Compute a stable cache/dedup key for a text.
+
+    Args:
+        text: The input text (canonicalized before hashing)
+        *qualifiers: Extra parts that change the output, e.g. model and voice
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    for part in (*qualifiers, canonicalize_text(text)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\x00")
+    return digest.hexdigest()
+
+
+__all__ = [
+    'canonicalize_text',
+    'text_cache_key',
+    'CANONICAL_TABLE'
+]
@@ -0,0 +1,145 @@
+"""
+TTS Audio Cache.
+
+This module keeps recently synthesized audio in memory so that repeated texts
+are not sent to a provider again. Entries are keyed by text_cache_key over the
+canonical text and the provider that produced the audio, so equivalent
+spellings of one text share an entry while audio from different models or
+voices never mixes. Identical texts requested concurrently share a single
+synthesis call.
+"""
+
+import os
+import asyncio
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional
+
+from .text_normalization import text_cache_key
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Settings (TTS_CACHE_ENTRIES=0 disables the cache)
+TTS_CACHE_ENTRIES = int(os.environ.get("TTS_CACHE_ENTRIES", "256"))
+TTS_CACHE_MAX_BYTES = int(os.environ.get("TTS_CACHE_MAX_MB", "64")) * 1024 * 1024
+
+
+class TTSAudioCache:
+    """LRU cache of raw PCM audio with in-flight request deduplication."""
+
+    def __init__(self, max_entries: int = TTS_CACHE_ENTRIES, max_bytes: int = TTS_CACHE_MAX_BYTES):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+        self._size = 0
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.hits = 0
+        self.misses = 0
+        self.deduplicated = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0
+
+    def get(self, text: str, provider_keys: Iterable[str]) -> Optional[bytes]:
+        """Return cached audio for the first provider (in routing order) that has the text."""
+        for provider_key in provider_keys:
+            key = text_cache_key(text, provider_key)
+            audio = self._entries.get(key)
+            if audio is not None:
+                self._entries.move_to_end(key)
+                return audio
+        return None
+
+    def put(self, text: str, provider_key: str, audio: bytes) -> None:
+        """Store audio produced by ``provider_key``, evicting least recently used entries."""
+        if not self.enabled or len(audio) > self.max_bytes:
+            return
+        key = text_cache_key(text, provider_key)
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous)
+        self._entries[key] = audio
+        self._size += len(audio)
+        while len(self._entries) > self.max_entries or self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted)
+
+    async def synthesize(self, text: str, router) -> bytes:
+        """
+        Return audio for text from the cache, a shared in-flight call or the router.
+
+        Only audio from regular (non-fallback) providers is cached; cached
+        entries are looked up in the router's current provider order.
+
+        Args:
+            text: Sanitized text to synthesize
+            router: TTSRouter used on a cache miss
+
+        Returns:
+            Raw PCM audio
+        """
+        if not self.enabled:
+            return await router.synthesize(text)
+
+        ranked = [p.key for p in router.ranked() if not p.fallback]
+        audio = self.get(text, ranked)
+        if audio is not None:
+            self.hits += 1
+            return audio
+
+        inflight_key = text_cache_key(text)
+        future = self._inflight.get(inflight_key)
+        if future is not None:
+            self.deduplicated += 1
+        else:
+            self.misses += 1
+            future = asyncio.ensure_future(self._synthesize(text, router))
+            self._inflight[inflight_key] = future
+            future.add_done_callback(lambda f: self._finish(inflight_key, f))
+        # Shield the shared call so one cancelled caller does not cancel the rest
+        return await asyncio.shield(future)
+
+    async def _synthesize(self, text: str, router) -> bytes:
+        audio, provider = await router.synthesize_with_provider(text)
+        if not provider.fallback:
+            self.put(text, provider.key, audio)
+        return audio
+
+    def _finish(self, inflight_key: str, future: asyncio.Future) -> None:
+        self._inflight.pop(inflight_key, None)
+        # Mark the error retrieved in case every caller was cancelled meanwhile
+        if not future.cancelled():
+            future.exception()
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return cache counters for the health endpoint."""
+        lookups = self.hits + self.misses + self.deduplicated
+        return {
+            "entries": len(self._entries),
+            "bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "deduplicated": self.deduplicated,
+            "hit_rate": round((self.hits + self.deduplicated) / lookups, 3) if lookups else 0.0
+        }
+
+
+_cache: Optional[TTSAudioCache] = None
+
+
+def get_tts_cache() -> TTSAudioCache:
+    """Return the process-wide TTS audio cache."""
+    global _cache
+    if _cache is None:
+        _cache = TTSAudioCache()
+    return _cache
+
+
+__all__ = [
+    'TTSAudioCache',
+    'get_tts_cache',
+    'TTS_CACHE_ENTRIES'
+]
@@ -0,0 +1,450 @@
+"""
+TTS Provider Routing.
+
+This module puts the speech backends behind a common provider interface and
+routes each request to the fastest healthy provider. Every provider (one per
+model/voice pair, plus an optional local synthesizer) keeps an exponentially
+weighted moving average (EWMA) of its latency and error rate; slow or failing
+providers are skipped until a periodic probe shows they have recovered.
+
+Latency is compared per character of input text, so a run of long texts does
+not make a provider look slow.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from .tts_service import (
+    TTSError,
+    TTS_MODEL,
+    TTS_VOICE,
+    TTS_REQUEST_TIMEOUT,
+    get_gemini_client
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Routing settings
+TTS_FALLBACK_MODELS = [
+    m.strip() for m in os.environ.get("TTS_FALLBACK_MODELS", "").split(",") if m.strip()
+]
+TTS_FALLBACK_VOICES = [
+    v.strip() for v in os.environ.get("TTS_FALLBACK_VOICES", "").split(",") if v.strip()
+]
+TTS_LOCAL_COMMAND = os.environ.get("TTS_LOCAL_COMMAND", "")
+PROVIDER_TIMEOUT = TTS_REQUEST_TIMEOUT
+EWMA_ALPHA = float(os.environ.get("TTS_EWMA_ALPHA", "0.3"))
+SLOW_THRESHOLD_MS_PER_CHAR = float(os.environ.get("TTS_SLOW_THRESHOLD_MS_PER_CHAR", "80"))
+# Short texts are dominated by fixed request overhead; count them as this long
+MIN_LATENCY_CHARS = 50
+TTS_SDK_WORKERS = int(os.environ.get("TTS_SDK_WORKERS", "8"))
+ERROR_THRESHOLD = 0.5
+PROBE_INTERVAL = 30.0
+
+# Ranking written by execution/verify_gemini_model.py
+TTS_MODEL_RANKING_PATH = os.environ.get(
+    "TTS_MODEL_RANKING_PATH",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), "model_ranking.json")
+)
+
+
+# Blocking SDK calls run here rather than in the loop's default executor, so a
+# provider outage cannot exhaust the threads the rest of the app relies on
+_sdk_executor = ThreadPoolExecutor(max_workers=TTS_SDK_WORKERS, thread_name_prefix="gemini-tts")
+
+
+def _ewma(current: Optional[float], sample: float) -> float:
+    if current is None:
+        return sample
+    return current + EWMA_ALPHA * (sample - current)
+
+
+class ProviderStats:
+    """EWMA latency and error tracking for a single provider."""
+
+    def __init__(self):
+        self.latency_ms: Optional[float] = None
+        self.ms_per_char: Optional[float] = None
+        self.error_rate = 0.0
+        self.requests = 0
+        self.failures = 0
+        self.last_attempt = 0.0
+
+    def _update_latency(self, latency_ms: float, chars: int) -> None:
+        self.latency_ms = _ewma(self.latency_ms, latency_ms)
+        self.ms_per_char = _ewma(self.ms_per_char, latency_ms / max(chars, MIN_LATENCY_CHARS))
+
+    def seed(self, latency_ms: float, chars: int) -> None:
+        """Start the EWMA from an offline measurement (e.g. the probe ranking)."""
+        self._update_latency(latency_ms, chars)
+
+    def record_success(self, latency_ms: float, chars: int) -> None:
+        """Record a successful call, its latency and the input text length."""
+        self.requests += 1
+        self.error_rate *= (1 - EWMA_ALPHA)
+        self._update_latency(latency_ms, chars)
+
+    def record_failure(self, latency_ms: Optional[float] = None, chars: int = 0) -> None:
+        """Record a failed call; timeouts also pass their latency and text length."""
+        self.requests += 1
+        self.failures += 1
+        self.error_rate += EWMA_ALPHA * (1 - self.error_rate)
+        if latency_ms is not None:
+            self._update_latency(latency_ms, chars)
+
+    def is_healthy(self, now: float) -> bool:
+        """
+        Return whether the provider should be preferred for the next request.
+
+        A degraded provider (error rate or latency over threshold) is let
+        through once every PROBE_INTERVAL seconds so it can prove it recovered.
+        """
+        degraded = (
+            self.error_rate >= ERROR_THRESHOLD
+            or (self.ms_per_char is not None and self.ms_per_char >= SLOW_THRESHOLD_MS_PER_CHAR)
+        )
+        if not degraded:
+            return True
+        return now - self.last_attempt >= PROBE_INTERVAL
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "latency_ms": round(self.latency_ms, 1) if self.latency_ms is not None else None,
+            "ms_per_char": round(self.ms_per_char, 2) if self.ms_per_char is not None else None,
+            "error_rate": round(self.error_rate, 3),
+            "requests": self.requests,
+            "failures": self.failures
+        }
+
+
+class TTSProvider:
+    """
+    Base class for speech synthesis backends.
+
+    Subclasses implement ``synthesize`` and return raw 16-bit mono PCM at
+    SAMPLE_RATE. Providers marked ``fallback`` are only used when no regular
+    provider is healthy.
+    """
+
+    fallback = False
+
+    def __init__(self, name: str, voice: str):
+        self.name = name
+        self.voice = voice
+        self.stats = ProviderStats()
+
+    @property
+    def key(self) -> str:
+        return f"{self.name}/{self.voice}"
+
+    async def synthesize(self, text: str) -> bytes:
+        raise NotImplementedError
+
+
+class GeminiTTSProvider(TTSProvider):
+    """Google Gemini TTS for one model/voice pair."""
+
+    def __init__(self, model: str = TTS_MODEL, voice: str = TTS_VOICE):
+        super().__init__(model, voice)
+        self.model = model
+
+    async def synthesize(self, text: str) -> bytes:
+        client = get_gemini_client()
+
+        if not hasattr(client, "GenerativeModel"):
+            # New google-genai SDK: the client is synchronous, keep it off the event loop
+            from google.genai import types
+
+            config = types.GenerateContentConfig(
+                response_modalities=["AUDIO"],
+                speech_config=types.SpeechConfig(
+                    voice_config=types.VoiceConfig(
+                        prebuilt_voice_config=types.PrebuiltVoiceConfig(
+                            voice_name=self.voice
+                        )
+                    )
+                )
+            )
+            response = await asyncio.get_running_loop().run_in_executor(
+                _sdk_executor,
+                functools.partial(
+                    client.models.generate_content,
+                    model=self.model,
+                    contents=text,
+                    config=config
+                )
+            )
+        else:
+            # Older google-generativeai SDK
+            model = client.GenerativeModel(self.model)
+            response = await model.generate_content_async(
+                text,
+                generation_config={
+                    "response_modalities": ["AUDIO"],
+                    "speech_config": {
+                        "voice_config": {
+                            "prebuilt_voice_config": {
+                                "voice_name": self.voice
+                            }
+                        }
+                    }
+                }
+            )
+
+        # Extract audio data
+        candidates = getattr(response, "candidates", None)
+        if candidates:
+            content = getattr(candidates[0], "content", None)
+            for part in getattr(content, "parts", None) or []:
+                if getattr(part, "inline_data", None) and part.inline_data.data:
+                    return bytes(part.inline_data.data)
+
+        raise TTSError(
+            "No audio data in TTS response",
+            error_code="NO_AUDIO_DATA"
+        )
+
+
+class LocalTTSProvider(TTSProvider):
+    """
+    Last-resort local synthesizer.
+
+    Either wraps an async callable ``synthesize_fn(text) -> bytes`` or runs a
+    shell command (TTS_LOCAL_COMMAND) that reads text on stdin and writes raw
+    16-bit mono PCM at SAMPLE_RATE to stdout, e.g. a piper or espeak-ng
+    pipeline.
+    """
+
+    fallback = True
+
+    def __init__(
+        self,
+        command: str = "",
+        synthesize_fn: Optional[Callable[[str], Awaitable[bytes]]] = None,
+        name: str = "local",
+        voice: str = "default"
+    ):
+        super().__init__(name, voice)
+        self.command = command
+        self.synthesize_fn = synthesize_fn
+
+    async def synthesize(self, text: str) -> bytes:
+        if self.synthesize_fn is not None:
+            return await self.synthesize_fn(text)
+
+        process = await asyncio.create_subprocess_shell(
+            self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        try:
+            stdout, stderr = await process.communicate(text.encode("utf-8"))
+        except asyncio.CancelledError:
+            process.kill()
+            raise
+
+        if process.returncode != 0 or not stdout:
+            raise TTSError(
+                f"Local TTS command failed: {stderr.decode('utf-8', 'replace').strip()}",
+                error_code="LOCAL_TTS_FAILED"
+            )
+        return stdout
+
+
+class TTSRouter:
+    """Routes synthesis requests across providers by health and EWMA latency."""
+
+    def __init__(self, providers: Optional[List[TTSProvider]] = None):
+        self.providers: List[TTSProvider] = list(providers or [])
+
+    def register_provider(self, provider: TTSProvider) -> None:
+        """Add a provider, e.g. a custom local synthesizer."""
+        self.providers.append(provider)
+
+    def ranked(self) -> List[TTSProvider]:
+        """
+        Order providers for the next request.
+
+        Healthy regular providers come first (fastest first, untried ones
+        after measured ones), then healthy fallbacks, then degraded providers
+        as a last resort. Ties keep registration order.
+        """
+        now = time.monotonic()
+
+        def sort_key(provider: TTSProvider):
+            stats = provider.stats
+            latency = stats.ms_per_char if stats.ms_per_char is not None else float("inf")
+            return (not stats.is_healthy(now), provider.fallback, latency)
+
+        return sorted(self.providers, key=sort_key)
+
+    async def synthesize(self, text: str) -> bytes:
+        """
+        Synthesize text with the best available provider, failing over in order.
+
+        Raises:
+            TTSError: If no provider is configured or every provider fails
+        """
+        audio, _ = await self.synthesize_with_provider(text)
+        return audio
+
+    async def synthesize_with_provider(self, text: str) -> Tuple[bytes, TTSProvider]:
+        """
+        Like ``synthesize``, but also return the provider that produced the audio.
+
+        Raises:
+            TTSError: If no provider is configured or every provider fails
+        """
+        if not self.providers:
+            raise TTSError("No TTS providers configured", error_code="NO_PROVIDERS")
+
+        errors: List[TTSError] = []
+        for provider in self.ranked():
+            stats = provider.stats
+            # Time each attempt locally: last_attempt is shared by concurrent
+            # requests and only drives the probe interval
+            start = time.monotonic()
+            stats.last_attempt = start
+            try:
+                audio = await asyncio.wait_for(provider.synthesize(text), PROVIDER_TIMEOUT)
+            except asyncio.TimeoutError:
+                stats.record_failure((time.monotonic() - start) * 1000, len(text))
+                logger.warning(f"TTS provider {provider.key} timed out after {PROVIDER_TIMEOUT}s")
+                errors.append(TTSError(
+                    f"{provider.key} timed out",
+                    error_code="TTS_TIMEOUT"
+                ))
+                continue
+            except TTSError as e:
+                stats.record_failure()
+                logger.warning(f"TTS provider {provider.key} failed: {e.message}")
+                errors.append(e)
+                continue
+            except Exception as e:
+                stats.record_failure()
+                logger.warning(f"TTS provider {provider.key} failed: {str(e)}")
+                errors.append(TTSError(
+                    f"Failed to generate speech: {str(e)}",
+                    error_code="TTS_GENERATION_FAILED"
+                ))
+                continue
+
+            latency_ms = (time.monotonic() - start) * 1000
+            stats.record_success(latency_ms, len(text))
+            logger.info(f"TTS served by {provider.key} in {latency_ms:.0f}ms")
+            return audio, provider
+
+        # Surface a shared cause (e.g. MISSING_API_KEY) so callers can map it
+        codes = {e.error_code for e in errors}
+        if len(errors) == 1 or len(codes) == 1:
+            raise errors[-1]
+        raise TTSError(
+            "All TTS providers failed: " + "; ".join(e.message for e in errors),
+            error_code="TTS_GENERATION_FAILED"
+        )
+
+    def snapshot(self) -> List[Dict[str, Any]]:
+        """Return per-provider stats in current routing order."""
+        now = time.monotonic()
+        return [
+            {
+                "provider": provider.key,
+                "fallback": provider.fallback,
+                "healthy": provider.stats.is_healthy(now),
+                **provider.stats.to_dict()
+            }
+            for provider in self.ranked()
+        ]
+
+
+def load_model_ranking(path: str = TTS_MODEL_RANKING_PATH) -> List[Dict[str, Any]]:
+    """
+    Load healthy TTS models from a probe ranking file, fastest first.
+
+    Returns:
+        Ranking entries (``model``, ``latency_ms``, ...); empty if the file
+        is missing or unreadable
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            ranking = json.load(f)
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        logger.warning(f"Ignoring unreadable model ranking {path}: {str(e)}")
+        return []
+
+    models = [
+        entry for entry in ranking.get("models", [])
+        if entry.get("kind") == "tts" and entry.get("healthy") and entry.get("model")
+    ]
+    logger.info(
+        f"Loaded model ranking from {path} (generated {ranking.get('generated_at')}): "
+        f"{[entry['model'] for entry in models]}"
+    )
+    return sorted(models, key=lambda entry: entry.get("rank", 0))
+
+
+def build_default_router() -> TTSRouter:
+    """
+    Build the router from TTS_MODEL/TTS_VOICE and the fallback settings.
+
+    Unless TTS_MODEL is set explicitly, the fastest healthy model from the
+    probe ranking file becomes the primary model, and every ranked model's
+    measured median latency seeds its provider's EWMA.
+    """
+    ranking = [] if "TTS_MODEL" in os.environ else load_model_ranking()
+    ranked_models = [entry["model"] for entry in ranking]
+    seed_latency = {entry["model"]: (entry.get("latency_ms") or {}).get("p50") for entry in ranking}
+
+    models = []
+    for model in ranked_models + [TTS_MODEL] + TTS_FALLBACK_MODELS:
+        if model not in models:
+            models.append(model)
+
+    router = TTSRouter()
+    for model in models:
+        for voice in [TTS_VOICE] + [v for v in TTS_FALLBACK_VOICES if v != TTS_VOICE]:
+            provider = GeminiTTSProvider(model, voice)
+            if seed_latency.get(model) is not None:
+                # The probe uses one short sentence, i.e. below MIN_LATENCY_CHARS
+                provider.stats.seed(seed_latency[model], MIN_LATENCY_CHARS)
+            router.register_provider(provider)
+    if TTS_LOCAL_COMMAND:
+        router.register_provider(LocalTTSProvider(command=TTS_LOCAL_COMMAND))
+
+    if ranked_models:
+        logger.info(f"TTS primary model from ranking: {ranked_models[0]}")
+    return router
+
+
+_router: Optional[TTSRouter] = None
+
+
+def get_tts_router() -> TTSRouter:
+    """Return the process-wide TTS router, building it on first use."""
+    global _router
+    if _router is None:
+        _router = build_default_router()
+    return _router
+
+
+__all__ = [
+    'TTSProvider',
+    'GeminiTTSProvider',
+    'LocalTTSProvider',
+    'TTSRouter',
+    'ProviderStats',
+    'build_default_router',
+    'load_model_ranking',
+    'get_tts_router'
+]
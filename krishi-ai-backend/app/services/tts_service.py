@@ -3,6 +3,7 @@ Text-to-Speech Service using Google Gemini TTS API.
 
 This module provides TTS functionality using the Gemini 2.5 Flash Preview TTS model.
 It converts text input to PCM audio (24kHz, mono) and returns base64-encoded audio data.
+Provider selection and failover live in tts_providers.
 """
 
 import os
@@ -11,18 +12,23 @@ import re
 import logging
 from typing import Optional, Tuple
 
+from . import audio_processing
+from .text_normalization import canonicalize_text, text_cache_key
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Constants
 MAX_TEXT_LENGTH = 1000
-TTS_MODEL = "gemini-2.5-flash-preview-tts"
-TTS_VOICE = "Kore"
+TTS_MODEL = os.environ.get("TTS_MODEL", "gemini-2.5-flash-preview-tts")
+TTS_VOICE = os.environ.get("TTS_VOICE", "Kore")
 SAMPLE_RATE = 24000
+TTS_POSTPROCESS = os.environ.get("TTS_POSTPROCESS", "False").lower() == "true"
+TTS_REQUEST_TIMEOUT = float(os.environ.get("TTS_PROVIDER_TIMEOUT", "20"))
 
 # Markdown characters to remove for TTS
-MARKDOWN_PATTERN = re.compile(r'[*#_~`]'')
+MARKDOWN_PATTERN = re.compile(r'[*#_~`]')
 
 
 class TTSError(Exception):
@@ -36,19 +42,22 @@ class TTSError(Exception):
 
 def sanitize_text(text: str) -> str:
     """
-    Sanitize text for TTS by removing markdown characters.
+    Sanitize text for TTS by removing markdown characters and canonicalizing it.
+    
+    Canonicalization (NFC, digit folding, ZWJ/ZWNJ removal, punctuation
+    normalization) runs here so that any cache or dedup key derived from the
+    sanitized text treats equivalent inputs as identical.
     
     Args:
         text: The input text to sanitize
         
     Returns:
-        Sanitized text with markdown characters removed
+        Sanitized, canonical text with markdown characters removed
     """
     # Remove markdown characters
     sanitized = MARKDOWN_PATTERN.sub('', text)
-    # Remove extra whitespace
-    sanitized = ' '.join(sanitized.split())
-    return sanitized
+    # Canonicalize (also collapses extra whitespace)
+    return canonicalize_text(sanitized)
 
 
 def validate_text(text: str) -> Tuple[bool, Optional[str]]:
@@ -97,7 +106,11 @@ def get_gemini_client():
     try:
         # Try the new google-genai SDK first
         from google import genai
-        client = genai.Client(api_key=api_key)
+        # HTTP timeout so a blocked SDK call returns instead of holding its worker thread
+        client = genai.Client(
+            api_key=api_key,
+            http_options={"timeout": int(TTS_REQUEST_TIMEOUT * 1000)}
+        )
         return client
     except ImportError:
         # Fall back to google-generativeai SDK
@@ -112,12 +125,47 @@ def get_gemini_client():
             )
 
 
-async def generate_speech(text: str) -> str:
+def encode_audio(audio_data, postprocess: Optional[bool] = None) -> str:
+    """
+    Optionally post-process raw PCM audio and encode it to base64.
+    
+    Args:
+        audio_data: Raw PCM audio data (16-bit, mono) from the TTS response
+        postprocess: Trim silence and normalize loudness; defaults to TTS_POSTPROCESS
+        
+    Returns:
+        Base64-encoded PCM audio data
+    """
+    if not isinstance(audio_data, bytes):
+        audio_data = bytes(audio_data)
+    
+    if postprocess is None:
+        postprocess = TTS_POSTPROCESS
+    
+    if postprocess:
+        if audio_processing.is_available():
+            audio_data, stats = audio_processing.postprocess_pcm(audio_data, SAMPLE_RATE)
+            logger.info(
+                f"Audio post-processing: {stats['bytes_in']} -> {stats['bytes_out']} bytes "
+                f"({stats['bytes_saved']} bytes saved)"
+            )
+        else:
+            logger.warning("NumPy is not installed - skipping audio post-processing")
+    
+    return base64.b64encode(audio_data).decode('utf-8')
+
+
+async def generate_speech(text: str, postprocess: Optional[bool] = None) -> str:
     """
-    Generate speech from text using Google Gemini TTS API.
+    Generate speech from text using the fastest healthy TTS provider.
+    
+    Providers (Gemini model/voice pairs and an optional local synthesizer)
+    are managed by the router in tts_providers. Repeated texts (after
+    canonicalization) are served from the audio cache in tts_cache.
     
     Args:
         text: The text to convert to speech (max 1000 characters)
+        postprocess: Trim silence and normalize loudness; defaults to TTS_POSTPROCESS
         
     Returns:
         Base64-encoded PCM audio data (24kHz, mono)
@@ -134,105 +182,22 @@ async def generate_speech(text: str) -> str:
     sanitized_text = sanitize_text(text)
     logger.info(f"Generating speech for text ({len(sanitized_text)} chars)")
     
-    try:
-        client = get_gemini_client()
-        
-        # Try using the new google-genai SDK
-        try:
-            from google import genai
-            from google.genai import types
-            
-            # Configure TTS
-            config = types.GenerateContentConfig(
-                response_modalities=["AUDIO"],
-                speech_config=types.SpeechConfig(
-                    voice_config=types.VoiceConfig(
-                        prebuilt_voice_config=types.PrebuiltVoiceConfig(
-                            voice_name=TTS_VOICE
-                        )
-                    )
-                )
-            )
-            
-            # Generate speech
-            response = client.models.generate_content(
-                model=TTS_MODEL,
-                contents=sanitized_text,
-                config=config
-            )
-            
-            # Extract audio data
-            if response.candidates and response.candidates[0].content.parts:
-                for part in response.candidates[0].content.parts:
-                    if hasattr(part, 'inline_data') and part.inline_data:
-                        audio_data = part.inline_data.data
-                        # Encode to base64
-                        if isinstance(audio_data, bytes):
-                            return base64.b64encode(audio_data).decode('utf-8')
-                        else:
-                            return base64.b64encode(bytes(audio_data)).decode('utf-8')
-            
-            raise TTSError(
-                "No audio data in TTS response",
-                error_code="NO_AUDIO_DATA"
-            )
-            
-        except ImportError:
-            # Fall back to google-generativeai SDK
-            import google.generativeai as genai
-            
-            # For the older SDK, we need to use a different approach
-            # The TTS model may not be directly supported in the older SDK
-            model = genai.GenerativeModel(TTS_MODEL)
-            
-            # Generate content with audio response
-            response = await model.generate_content_async(
-                sanitized_text,
-                generation_config={
-                    "response_modalities": ["AUDIO"],
-                    "speech_config": {
-                        "voice_config": {
-                            "prebuilt_voice_config": {
-                                "voice_name": TTS_VOICE
-                            }
-                        }
-                    }
-                }
-            )
-            
-            # Extract audio data from response
-            if hasattr(response, 'candidates') and response.candidates:
-                candidate = response.candidates[0]
-                if hasattr(candidate, 'content') and hasattr(candidate.content, 'parts'):
-                    for part in candidate.content.parts:
-                        if hasattr(part, 'inline_data') and part.inline_data:
-                            audio_data = part.inline_data.data
-                            if isinstance(audio_data, bytes):
-                                return base64.b64encode(audio_data).decode('utf-8')
-                            else:
-                                return base64.b64encode(bytes(audio_data)).decode('utf-8')
-            
-            raise TTSError(
-                "No audio data in TTS response",
-                error_code="NO_AUDIO_DATA"
-            )
-            
-    except TTSError:
-        raise
-    except Exception as e:
-        logger.error(f"TTS generation failed: {str(e)}")
-        raise TTSError(
-            f"Failed to generate speech: {str(e)}",
-            error_code="TTS_GENERATION_FAILED"
-        )
+    # Serve repeats from the cache, otherwise route to the fastest healthy provider
+    # (imported here to avoid a circular import)
+    from .tts_providers import get_tts_router
+    from .tts_cache import get_tts_cache
+    
+    audio_data = await get_tts_cache().synthesize(sanitized_text, get_tts_router())
+    return encode_audio(audio_data, postprocess)
 
 
-def generate_speech_sync(text: str) -> str:
+def generate_speech_sync(text: str, postprocess: Optional[bool] = None) -> str:
     """
     Synchronous version of generate_speech for compatibility.
     
     Args:
         text: The text to convert to speech (max 1000 characters)
+        postprocess: Trim silence and normalize loudness; defaults to TTS_POSTPROCESS
         
     Returns:
         Base64-encoded PCM audio data (24kHz, mono)
@@ -252,21 +217,26 @@ def generate_speech_sync(text: str) -> str:
         # If we're already in an async context, create a new thread
         import concurrent.futures
         with concurrent.futures.ThreadPoolExecutor() as executor:
-            future = executor.submit(asyncio.run, generate_speech(text))
+            future = executor.submit(asyncio.run, generate_speech(text, postprocess))
             return future.result()
     else:
-        return loop.run_until_complete(generate_speech(text))
+        return loop.run_until_complete(generate_speech(text, postprocess))
 
 
 # For backward compatibility and direct imports
 __all__ = [
     'generate_speech',
     'generate_speech_sync',
+    'encode_audio',
     'sanitize_text',
+    'canonicalize_text',
+    'text_cache_key',
     'validate_text',
     'TTSError',
     'MAX_TEXT_LENGTH',
     'TTS_MODEL',
     'TTS_VOICE',
-    'SAMPLE_RATE'
+    'SAMPLE_RATE',
+    'TTS_POSTPROCESS',
+    'TTS_REQUEST_TIMEOUT'
 ]
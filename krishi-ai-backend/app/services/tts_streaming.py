@@ -0,0 +1,205 @@
+"""
+Incremental Text-to-Speech Streaming.
+
+This module lets a client push text in pieces (e.g. chat answer tokens as they
+are generated). Completed sentences are detected as they arrive and synthesized
+concurrently while more text streams in; results are yielded strictly in
+sentence order so audio can be played back as soon as the first one is ready.
+"""
+
+import os
+import re
+import asyncio
+import logging
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional
+
+from .tts_service import (
+    generate_speech,
+    sanitize_text,
+    TTSError,
+    MAX_TEXT_LENGTH
+)
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# Streaming settings
+STREAM_CONCURRENCY = int(os.environ.get("TTS_STREAM_CONCURRENCY", "3"))
+STREAM_MAX_CHARS = int(os.environ.get("TTS_STREAM_MAX_CHARS", "10000"))
+# Total text one WebSocket connection may synthesize across all its utterances
+STREAM_CONNECTION_MAX_CHARS = int(os.environ.get("TTS_STREAM_CONNECTION_MAX_CHARS", "50000"))
+
+# A sentence ends at . ! ? or the Bangla dari, optionally followed by closing
+# quotes/brackets, and then whitespace. Requiring whitespace keeps decimals
+# such as "0.5g" together while the next token is still streaming in.
+SENTENCE_END_PATTERN = re.compile(r'[.!?।]+["\'”’)\]]*\s+')
+SOFT_BREAK_PATTERN = re.compile(r'[,;:]\s+|\s+')
+SPEAKABLE_PATTERN = re.compile(r'\w')
+
+
+class SentenceSplitter:
+    """Accumulates streamed text and emits completed sentences."""
+
+    def __init__(self, max_length: int = MAX_TEXT_LENGTH):
+        self.max_length = max_length
+        self._buffer = ""
+
+    def feed(self, text: str) -> List[str]:
+        """
+        Add text and return any sentences it completed.
+
+        Args:
+            text: The next chunk of streamed text
+
+        Returns:
+            Completed sentences, in order
+        """
+        self._buffer += text
+        sentences = []
+
+        while True:
+            match = SENTENCE_END_PATTERN.search(self._buffer)
+            if match and match.end() <= self.max_length:
+                cut = match.end()
+            elif len(self._buffer) > self.max_length:
+                cut = self._soft_break(self._buffer)
+            else:
+                break
+            sentences.append(self._buffer[:cut].strip())
+            self._buffer = self._buffer[cut:]
+
+        return [s for s in sentences if s]
+
+    def flush(self) -> List[str]:
+        """Return whatever text remains as a final sentence."""
+        remainder = self._buffer.strip()
+        self._buffer = ""
+        sentences = []
+        while len(remainder) > self.max_length:
+            cut = self._soft_break(remainder)
+            sentences.append(remainder[:cut].strip())
+            remainder = remainder[cut:].strip()
+        if remainder:
+            sentences.append(remainder)
+        return sentences
+
+    def _soft_break(self, text: str) -> int:
+        """Find a cut point for an over-long run without a sentence end."""
+        cut = 0
+        for match in SOFT_BREAK_PATTERN.finditer(text, 0, self.max_length):
+            cut = match.end()
+        return cut or self.max_length
+
+
+class SpeechStream:
+    """
+    Pipelined synthesis of incrementally pushed text.
+
+    Call ``feed`` with text as it arrives and ``finish`` when the utterance is
+    complete, while iterating ``results`` in another task. Each result is a
+    message dict with ``type`` "audio" or "error" and a ``seq`` number.
+    """
+
+    def __init__(
+        self,
+        synthesize: Callable[[str], Awaitable[str]] = generate_speech,
+        max_concurrency: int = STREAM_CONCURRENCY,
+        max_chars: int = STREAM_MAX_CHARS
+    ):
+        self.synthesize = synthesize
+        self.max_chars = max_chars
+        self._splitter = SentenceSplitter()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._queue: "asyncio.Queue[Optional[asyncio.Task]]" = asyncio.Queue()
+        self._chars = 0
+        self._seq = 0
+        self._finished = False
+
+    def feed(self, text: str) -> None:
+        """
+        Push the next chunk of text.
+
+        Raises:
+            TTSError: If the stream is finished or exceeds the length limit
+        """
+        if self._finished:
+            raise TTSError("Stream is already finished", error_code="STREAM_FINISHED")
+
+        self._chars += len(text)
+        if self._chars > self.max_chars:
+            raise TTSError(
+                f"Streamed text exceeds maximum length of {self.max_chars} characters",
+                error_code="INVALID_INPUT"
+            )
+
+        for sentence in self._splitter.feed(text):
+            self._schedule(sentence)
+
+    def finish(self) -> None:
+        """Flush the remaining text and mark the end of the utterance."""
+        if self._finished:
+            return
+        for sentence in self._splitter.flush():
+            self._schedule(sentence)
+        self._finished = True
+        self._queue.put_nowait(None)
+
+    async def results(self) -> AsyncIterator[Dict[str, Any]]:
+        """Yield synthesis results in sentence order until ``finish``."""
+        while True:
+            task = await self._queue.get()
+            if task is None:
+                return
+            yield await task
+
+    async def aclose(self) -> None:
+        """Cancel any synthesis still in flight."""
+        pending = []
+        while not self._queue.empty():
+            task = self._queue.get_nowait()
+            if task is not None:
+                task.cancel()
+                pending.append(task)
+        await asyncio.gather(*pending, return_exceptions=True)
+
+    def _schedule(self, sentence: str) -> None:
+        # Skip fragments with nothing to say, e.g. a stray "**" or "।"
+        if not SPEAKABLE_PATTERN.search(sanitize_text(sentence)):
+            return
+        seq = self._seq
+        self._seq += 1
+        self._queue.put_nowait(asyncio.create_task(self._run(seq, sentence)))
+
+    async def _run(self, seq: int, sentence: str) -> Dict[str, Any]:
+        async with self._semaphore:
+            try:
+                audio = await self.synthesize(sentence)
+            except TTSError as e:
+                logger.warning(f"Streamed sentence {seq} failed: {e.message}")
+                return {
+                    "type": "error",
+                    "seq": seq,
+                    "text": sentence,
+                    "error": e.message,
+                    "error_code": e.error_code
+                }
+            except Exception as e:
+                logger.error(f"Streamed sentence {seq} failed: {str(e)}")
+                return {
+                    "type": "error",
+                    "seq": seq,
+                    "text": sentence,
+                    "error": f"An unexpected error occurred: {str(e)}",
+                    "error_code": "INTERNAL_ERROR"
+                }
+        return {"type": "audio", "seq": seq, "text": sentence, "audio": audio}
+
+
+__all__ = [
+    'SentenceSplitter',
+    'SpeechStream',
+    'STREAM_CONCURRENCY',
+    'STREAM_MAX_CHARS',
+    'STREAM_CONNECTION_MAX_CHARS'
+]